@@ -9,6 +9,7 @@ import tomli
 import shutil
 
 from dataclasses import dataclass, asdict, fields
+from functools import lru_cache
 from pathlib import Path
 
 from deepfacility.utils import util, spatial
@@ -495,8 +496,8 @@ class Config(RuntimeArgs):
         to construct the list of target locations to be processed."""
         # Read all locations from the input `all_locations_file`
         if self.location_filter:  # if location filter is specified, parse it and apply it
-            locations = [util.strip_accents(p) for p in self.location_filter]
-            self.locations = [loc for loc in get_all_locations(self) if any([re.match(p, loc) for p in locations])]
+            patterns = [re.compile(util.strip_accents(p)) for p in self.location_filter]
+            self.locations = [loc for loc in get_all_locations(self) if any(p.match(loc) for p in patterns)]
         else:  # if location filter is not specified return all locations
             self.locations = get_all_locations(self)
 
@@ -563,9 +564,12 @@ def is_str_item(k: str, v: Path) -> bool:
     return k_type_ok and v_type_ok
 
 
+path_key_pattern = re.compile(".*(_file|_dir)$")  # config keys of file or dir values
+
+
 def is_path_key(k: str) -> bool:
     """Check if the key represents a file or dir."""
-    return k in ["file", "dir"] or re.match(".*(_file|_dir)$", str(k))
+    return k in ["file", "dir"] or path_key_pattern.match(str(k))
 
 
 def path_to_obj(data: dict):
@@ -610,15 +614,19 @@ class ResultData:
 
     def save(self, rf: ResultFiles):
         """Save result data to files."""
-        self.gdf_shapes.to_file(rf.shape_file.with_suffix('.geojson'), driver='GeoJSON')
+        self.gdf_shapes.to_file(rf.shape_file.with_suffix('.geojson'), driver='GeoJSON', engine="pyogrio")
         self.df_clusters.to_csv(rf.clusters_file, index=False, encoding='utf-8')
         self.df_centers.to_csv(rf.centers_file, index=False, encoding='utf-8')
         self.df_counts.to_csv(rf.counts_file, index=False, encoding='utf-8')
         self.df_facilities.to_csv(rf.facilities_file, index=False, encoding='utf-8')
 
 
+@lru_cache(maxsize=1)
 def read_s2_dict() -> dict[str, dict[str, object]]:
-    """Read the `country to S2 geometry` lookup dict, used to download Google Open Buildings files."""
+    """
+    Read the `country to S2 geometry` lookup dict, used to download Google Open Buildings files.
+    The parsed dict is cached and shared, callers must not modify it.
+    """
     with open(Path(__file__).parent.joinpath("countries_s2_tokens.json"), encoding="utf-8") as fp:
         s2s: dict = json.load(fp)
     return s2s
@@ -664,7 +672,7 @@ def get_adm_columns(ins: Inputs, df: pd.DataFrame):
 def get_all_locations(cfg: Config) -> list[str]:
     """Get all locations from the `all_locations_file`."""
     if cfg.inputs.all_locations_file.is_file():
-        return cfg.inputs.all_locations_file.read_text().splitlines()
+        return util.read_lines_cached(cfg.inputs.all_locations_file)
     else:
         return []
 
@@ -258,7 +258,7 @@ class DataInputs(WorkflowEntity):
         df = pd.DataFrame(gdf[new_cols])
 
         # Generate Google Plus codes based on baseline coordinates
-        df["plus"] = df.apply(lambda r: spatial.get_plus_code(r.lon, r.lat), axis=1)
+        df["plus"] = spatial.get_plus_codes(df[bs.xy_cols[0]].to_numpy(), df[bs.xy_cols[1]].to_numpy())
 
         # Save the prepared baseline facilities
         Path.mkdir(bs.file.parent, exist_ok=True)
@@ -314,6 +314,9 @@ def process_google_buildings(gdf_shapes: gpd.GeoDataFrame,
     point_count = len(df_xy)
     chunk_size = 1000000  # TODO: cacl based on available RAM
     chunk_count = point_count // chunk_size
+
+    # Build the shapes spatial index once for all chunks
+    shapes = spatial.CachedSjoin(gdf_shp)
     
     df_hh: pd.DataFrame = None
     for p in range(chunk_count + 1):
@@ -326,7 +329,7 @@ def process_google_buildings(gdf_shapes: gpd.GeoDataFrame,
         df = df_xy.iloc[start:end]
         
         # Clip buildings chunk to shapes
-        gdf = spatial.join_xy_shapes(df, hh_xy_cols, gdf_shp)
+        gdf = spatial.join_xy_shapes(df, hh_xy_cols, shapes)
 
         # Concatenate the processed chunk results to the final DataFrame
         df = pd.DataFrame(gdf[hh_cols])
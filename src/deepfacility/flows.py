@@ -89,7 +89,7 @@ class DataPrepWorkflow(Workflow):
         :param stats_file: Path to save the stats.
         :return: True if the number of shapes is sufficient.
         """
-        shapes: gpd.GeoDataFrame = gpd.read_file(shapes_file)
+        shapes: gpd.GeoDataFrame = gpd.read_file(shapes_file, engine="pyogrio")
         df_households: pd.DataFrame = pd.read_csv(households_file)
 
         # Calculate household counts per shape stats
@@ -312,14 +312,14 @@ class ScientificWorkflow(Workflow):
         :return: ResultFiles: Result files
         """
         # Prep shape GeoDataFrames
-        gdf_adm3_all = gpd.read_file(adm_files[-1])
+        gdf_adm3_all = gpd.read_file(adm_files[-1], engine="pyogrio")
         gdf_adm3 = filter_by_locations(ins=self.cfg.inputs, df=gdf_adm3_all, locations=[location])
     
         # Check if the clustered households file exists and is not empty
         if not (ch.valid and ch.clusters_file.is_file()):
             return None
     
-        df_cs = pd.read_csv(ch.clusters_file, encoding='utf-8')
+        df_cs = pd.read_parquet(ch.clusters_file)
         if len(df_cs) == 0:
             return None
     
@@ -332,7 +332,7 @@ class ScientificWorkflow(Workflow):
         self.logger.debug(f"Completed creating cluster shapes for: {location}.")
         
         # Save cluster shapes
-        shape_file = spatial.location_path(pattern=self.cfg.results.shapes.file, location=location)
+        shape_file = spatial.location_data_path(pattern=self.cfg.results.shapes.file, location=location)
         outlines.export_cluster_shapes(cluster_shapes=gdf_shp, shape_file=shape_file)
         
         self.logger.debug(f"Completed exporting cluster shapes for: {location}.")
@@ -350,8 +350,8 @@ class ScientificWorkflow(Workflow):
                                                                     gdf_shp=gdf_shp)
         
         # Save the calculated distances and cluster centers
-        ch.clusters_df.to_csv(ch.clusters_file, index=False, encoding='utf-8')
-        ch.centers_df.to_csv(ch.centers_file, index=False, encoding='utf-8')
+        ch.clusters_df.to_parquet(ch.clusters_file, index=False)
+        ch.centers_df.to_parquet(ch.centers_file, index=False)
         self.logger.debug(f"Completed distance calculations for: {location}.")
         
         self.cfg.results.raise_if_stopped()
@@ -379,8 +379,8 @@ class ScientificWorkflow(Workflow):
             self.logger.debug(f"Completed plotting baseline distance for: {location}.")
     
         # Save recommended health facility placements to file
-        facilities_file = spatial.location_path(pattern=self.cfg.results.facilities.file, location=location)
-        df_facilities.to_csv(facilities_file, index=False, encoding='utf-8')
+        facilities_file = spatial.location_data_path(pattern=self.cfg.results.facilities.file, location=location)
+        df_facilities.to_parquet(facilities_file, index=False)
         
         self.logger.debug(f"Completed exporting facilities for: {location}.")
     
@@ -43,6 +43,10 @@ class BaseTranslator:
     def translate(self, msg: str) -> None:
         """Translate a message to the current language."""
         raise NotImplementedError()
+
+    def translate_many(self, msgs: list[str]) -> list[str]:
+        """Translate messages to the current language, a subclass may translate them in a single batch."""
+        return [self.translate(msg) for msg in msgs]
     
     #
     ######################################################
@@ -38,3 +38,22 @@ class TranslatorI18N(DefaultTranslator):
             return translated_msg
         else:
             return default_translated_msg
+
+    def translate_many(self, msgs: list[str]) -> list[str]:
+        """Translate messages to the current language, generating missing translations in a single batch."""
+        if self.language not in self._supported_lang.keys():
+            return list(msgs)
+
+        res = [super(TranslatorI18N, self).translate(msg) for msg in msgs]
+        missing = [i for i, msg in enumerate(msgs) if msg == res[i]] if self.language != "en" else []
+        if missing:
+            translator = pipeline('translation',
+                                  model=self.model,
+                                  tokenizer=self.tokenizer,
+                                  src_lang=self._supported_lang["en"],
+                                  tgt_lang=self._supported_lang[self.language],
+                                  max_length=400)
+            output = translator([msgs[i] for i in missing])
+            for i, out in zip(missing, output):
+                res[i] = out['translation_text']
+        return res
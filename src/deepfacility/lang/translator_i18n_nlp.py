@@ -32,4 +32,18 @@ class TranslatorI18N_NLP(DefaultTranslator):
             translated_msg = self.tokenizer.batch_decode(generated_ids, skip_special_tokens=True)[0]
             return translated_msg
         else:
-            return default_translated_msg
\ No newline at end of file
+            return default_translated_msg
+
+    def translate_many(self, msgs: list[str]) -> list[str]:
+        """Translate messages to the current language, generating missing translations in a single batch."""
+        if self.language not in self._supported_lang.keys():
+            return list(msgs)
+
+        res = [super(TranslatorI18N_NLP, self).translate(msg) for msg in msgs]
+        missing = [i for i, msg in enumerate(msgs) if msg == res[i]] if self.language != "en" else []
+        if missing:
+            batch = self.tokenizer([msgs[i] for i in missing], return_tensors="pt", padding=True)
+            generated_ids = self.model.generate(**batch)
+            for i, translated_msg in zip(missing, self.tokenizer.batch_decode(generated_ids, skip_special_tokens=True)):
+                res[i] = translated_msg
+        return res
\ No newline at end of file
@@ -1,7 +1,7 @@
 import pandas as pd
 import warnings
 
-warnings.simplefilter(action='ignore', category=FutureWarning)
+warnings.filterwarnings(action='ignore', category=FutureWarning, module=__name__)
 
 from deepfacility.config.config import Config, AdmPointsFile, ResultsClusteredHouseholds
 from deepfacility.utils import util, spatial
@@ -57,19 +57,19 @@ class ClusteredHouseholds:
     def clusters_file(self):
         """Return the clusters file path."""
         file_pattern = self.cfg.results.clusters.file
-        return spatial.location_path(file_pattern, self.location)
+        return spatial.location_data_path(file_pattern, self.location)
     
     @property
     def centers_file(self):
         """Return the cluster centers file path."""
         file_pattern = self.cfg.results.clusters.centers_file
-        return spatial.location_path(file_pattern, self.location)
+        return spatial.location_data_path(file_pattern, self.location)
 
     @property
     def counts_file(self):
         """Return the cluster counts file path."""
         file_pattern = self.cfg.results.clusters.counts_file
-        return spatial.location_path(file_pattern, self.location)
+        return spatial.location_data_path(file_pattern, self.location)
     
     @property
     def converged(self) -> bool:
@@ -153,9 +153,9 @@ class ClusteredHouseholds:
     def save(self) -> object:
         """Save the clustered households and village centers data to files."""
         if self.valid:
-            self._df_clusters.to_csv(self.clusters_file, index=False, encoding='utf-8')
-            self._df_centers.to_csv(self.centers_file, index=False, encoding='utf-8')
-            self._df_counts.reset_index().to_csv(self.counts_file, index=False, encoding='utf-8')
+            self._df_clusters.to_parquet(self.clusters_file, index=False)
+            self._df_centers.to_parquet(self.centers_file, index=False)
+            self._df_counts.reset_index().to_parquet(self.counts_file, index=False)
         else:
             raise ValueError(f"Invalid data for '{self.location}'")
         return self
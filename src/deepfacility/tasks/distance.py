@@ -1,10 +1,13 @@
 import geopandas as gpd
+import hashlib
 import pandas as pd
-import matplotlib
-matplotlib.use('agg')
-import matplotlib.pyplot as plt
 import numpy as np
+import os
+import shutil
+import tempfile
 
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from scipy.spatial import distance
 
 from pathlib import Path
@@ -12,24 +15,21 @@ from pathlib import Path
 from deepfacility.config.config import Config
 from deepfacility.utils import spatial, util
 
-if util.is_linux():
-    lock = None
-else:
-    import threading
-    lock = threading.Lock()
-
-
 # Initialize data cache
 memory = util.memory_cache()
 
+# Most recently used ECDF plots kept in the plots cache
+plot_cache_max_files = 256
+
 
-def convert_to_cartesian(lon, lat, elevation=0):
+def convert_to_cartesian(lon, lat, elevation=0, out: np.ndarray = None):
     """
     Convert longitude, latitude, and elevation to Cartesian coordinates.
     :param lon: Longitude in degrees (float).
     :param lat: Latitude in degrees (float).
     :param elevation: Elevation in meters (float, optional). Default is 0.
-    :return: tuple: Cartesian coordinates (x, y, z).
+    :param out: numpy.ndarray, optional. Array of shape (n, 3) to write x, y, z columns into.
+    :return: tuple: Cartesian coordinates (x, y, z), or `out` if provided.
     """
     # Radius of the Earth in meters
     earth_radius = 6378137.0  # unit: meter
@@ -42,6 +42,13 @@ def convert_to_cartesian(lon, lat, elevation=0):
     R = (earth_radius + elevation)
 
     # Calculate Cartesian coordinates
+    if out is not None:
+        r_cos_lat = R * np.cos(lat)
+        np.multiply(r_cos_lat, np.cos(lon), out=out[:, 0])
+        np.multiply(r_cos_lat, np.sin(lon), out=out[:, 1])
+        np.multiply(R, np.sin(lat), out=out[:, 2])
+        return out
+    
     x = R * np.cos(lat) * np.cos(lon)
     y = R * np.cos(lat) * np.sin(lon)
     z = R * np.sin(lat)
@@ -49,22 +56,86 @@ def convert_to_cartesian(lon, lat, elevation=0):
     return x, y, z
 
 
-def find_nearest_facility(location_xy: np.ndarray, facility_xy: np.ndarray):
+def cartesian_with_norms(df: pd.DataFrame, xy_cols: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert lon/lat columns to cartesian coordinates and their squared norms.
+    :param df: pd.DataFrame. DataFrame containing the lon and lat coordinates.
+    :param xy_cols: list[str]: The column names in `df` representing the lon and lat coordinates.
+    :returns: tuple. Array of x, y, z coordinates (one point per row) and array of squared norms.
+    """
+    xyz = np.empty((len(df), 3), dtype=np.float64)
+    convert_to_cartesian(df[xy_cols[0]].to_numpy(dtype=np.float64, copy=False),
+                         df[xy_cols[1]].to_numpy(dtype=np.float64, copy=False),
+                         out=xyz)
+    norms_sq = np.einsum('ij,ij->i', xyz, xyz)
+    return xyz, norms_sq
+
+
+def find_nearest_facility(location_xy: np.ndarray,
+                          facility_xy: np.ndarray,
+                          location_norms: np.ndarray = None,
+                          facility_norms: np.ndarray = None):
     """
     Find the nearest facility for each location.
     :param location_xy: numpy.ndarray. Array of location coordinates.
     :param facility_xy: numpy.ndarray. Array of facility coordinates.
+    :param location_norms: numpy.ndarray, optional. Precomputed squared norms of location coordinates.
+    :param facility_norms: numpy.ndarray, optional. Precomputed squared norms of facility coordinates.
     :returns: tuple. A tuple containing two lists:
         - List of indices of the nearest facility for each location.
         - List of shortest distances from each location to its nearest facility.
     """
-    # Calculate pairwise Euclidean distances using cdist
-    distances = distance.cdist(location_xy, facility_xy, metric='euclidean')
+    if location_norms is None or facility_norms is None:
+        # Calculate pairwise Euclidean distances using cdist
+        distances = distance.cdist(location_xy, facility_xy, metric='euclidean')
+
+        # Find the nearest facility for each household
+        nearest_facility_indices = distances.argmin(axis=1)
+
+        return nearest_facility_indices, distances.min(axis=1)
 
-    # Find the nearest facility for each household
-    nearest_facility_indices = distances.argmin(axis=1)
+    # Rank facilities by squared distances expanded as |a|^2 + |b|^2 - 2ab (single matrix product)
+    distances_sq = location_xy @ facility_xy.T
+    distances_sq *= -2
+    distances_sq += location_norms[:, None]
+    distances_sq += facility_norms[None, :]
+    nearest_facility_indices = distances_sq.argmin(axis=1)
 
-    return nearest_facility_indices, distances.min(axis=1)
+    # Calculate exact distances to the nearest facilities only
+    diff = location_xy - facility_xy[nearest_facility_indices]
+    shortest_distances = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+
+    return nearest_facility_indices, shortest_distances
+
+
+def minkowski_rows(u: np.ndarray, v: np.ndarray, p: float = 1.54) -> np.ndarray:
+    """
+    Calculate the Minkowski distance between matching rows of two coordinate arrays.
+    :param u: numpy.ndarray. Array of coordinates, one point per row.
+    :param v: numpy.ndarray. Array of coordinates with the same shape as `u`.
+    :param p: float, optional: Minkowski distance parameter. Default is 1.54.
+    :returns: numpy.ndarray: Minkowski distance for each row.
+    """
+    # Compute |u - v|^p in place to avoid allocating temporaries
+    d = np.subtract(u, v, dtype=np.float64)
+    np.abs(d, out=d)
+    np.power(d, p, out=d)
+    return np.power(d.sum(axis=1), 1 / p)
+
+
+def minkowski_from_pairs(location_xyz: np.ndarray,
+                         facility_xyz: np.ndarray,
+                         facility_indices: np.ndarray,
+                         p: float = 1.54) -> np.ndarray:
+    """
+    Calculate the Minkowski distance between each location and its assigned facility.
+    :param location_xyz: numpy.ndarray. Array of location coordinates.
+    :param facility_xyz: numpy.ndarray. Array of facility coordinates.
+    :param facility_indices: numpy.ndarray. Index of the assigned facility for each location.
+    :param p: float, optional: Minkowski distance parameter. Default is 1.54.
+    :returns: numpy.ndarray: Minkowski distance for each location.
+    """
+    return minkowski_rows(location_xyz, facility_xyz[facility_indices], p=p)
 
 
 def calculate_minkowski_from_cartesian(df_locations: pd.DataFrame,
@@ -83,19 +154,20 @@ def calculate_minkowski_from_cartesian(df_locations: pd.DataFrame,
     :param distance_col: str: The name of the column where the Minkowski distance will be stored. Default is 'minkowski'.
     :returns: pd.DataFrame: DataFrame with Minkowski distances.
     """
-    suffixes = ('_loc', '_facility')
-    df_merged = pd.merge(df_locations, df_facilities, left_on=left_on, right_on=right_on, suffixes=suffixes)
-    # Calculate the Minkowski distance using x, y, z coordinates
-    df_merged[distance_col] = df_merged.apply(
-        lambda row: distance.minkowski(
-            [row['x_loc'], row['y_loc'], row['z_loc']],
-            [row['x_facility'], row['y_facility'], row['z_facility']],
-            p=p), axis=1)
-
-    df_merged.columns = [col.rstrip('_loc') if col.endswith('_loc') else col for col in df_merged.columns]
-    cols_to_keep = list(df_locations.columns) + [distance_col]
-    merged_df = df_merged[cols_to_keep]
-    return merged_df
+    xyz_cols = ['x', 'y', 'z']
+    
+    # Locate the row of the matching facility for each location (-1 if not found)
+    df_facilities = df_facilities.drop_duplicates(subset=right_on)
+    facility_indices = pd.Index(df_facilities[right_on]).get_indexer(df_locations[left_on])
+    found = facility_indices >= 0
+    
+    # Calculate the Minkowski distance using x, y, z coordinates of the matched pairs
+    df = df_locations[found].reset_index(drop=True)
+    df[distance_col] = minkowski_from_pairs(df[xyz_cols].to_numpy(dtype=np.float64, copy=False),
+                                            df_facilities[xyz_cols].to_numpy(dtype=np.float64, copy=False),
+                                            facility_indices[found],
+                                            p=p)
+    return df
 
 
 def calculate_distance_df(df: pd.DataFrame,
@@ -103,7 +175,8 @@ def calculate_distance_df(df: pd.DataFrame,
                           df2: pd.DataFrame,
                           xy_cols2: list[str],
                           col_prefix: str,
-                          id_col: str = 'facility_id') -> pd.DataFrame:
+                          id_col: str = 'facility_id',
+                          facility_xyz: tuple[np.ndarray, np.ndarray] = None) -> pd.DataFrame:
     """
     Calculate the distance between each point in two dataframes.
     :param df: pd.DataFrame: The DataFrame containing the points.
@@ -113,43 +186,23 @@ def calculate_distance_df(df: pd.DataFrame,
     :param col_prefix: str: The prefix for the distance column names in the output DataFrame, which will be
                                {prefix}_minkowski and {prefix}_euclidean.
     :param id_col: Facility ID column name.
+    :param facility_xyz: tuple, optional. Precomputed `cartesian_with_norms` result for `df2`.
     :returns: pd.DataFrame: The input DataFrame with additional columns for the assigned facility and the distances.
     """
     # Calculate the cartesian coordinates for the points and the facilities
     if len(df) == 0 or len(df2) == 0:
         return df
     
-    xy = convert_to_cartesian(df[xy_cols[0]].values, df[xy_cols[1]].values)
-    df['x'] = xy[0]
-    df['y'] = xy[1]
-    df['z'] = xy[2]
-    # df[['x', 'y', 'z']] = df.apply(
-    #     lambda row: pd.Series(convert_to_cartesian(row[df_xy[0]], row[df_xy[1]])), axis=1)
-    xy2 = convert_to_cartesian(df2[xy_cols2[0]].values, df2[xy_cols2[1]].values)
-    df2['x'] = xy2[0]
-    df2['y'] = xy2[1]
-    df2['z'] = xy2[2]
-
-    # get Series values as array for pair-wise distance calculation
-    xy_ser = df[['x', 'y', 'z']].values
-    xy_ser2 = df2[['x', 'y', 'z']].values
-
-    nearest_indices, distances = find_nearest_facility(xy_ser, xy_ser2)
+    xy_ser, norms = cartesian_with_norms(df, xy_cols)
+    xy_ser2, norms2 = facility_xyz if facility_xyz is not None else cartesian_with_norms(df2, xy_cols2)
+
+    nearest_indices, distances = find_nearest_facility(xy_ser, xy_ser2, norms, norms2)
 
     # assign facilities id to household for easier calculation
-    nearest_ids = df2[id_col][nearest_indices]
-    assigned_id_col = f'{col_prefix}_assigned_id'
-    df[assigned_id_col] = nearest_ids.values
+    df = df.copy()
+    df[f'{col_prefix}_assigned_id'] = df2[id_col].to_numpy()[nearest_indices]
     df[f'{col_prefix}_euclidean'] = distances
-
-    df = calculate_minkowski_from_cartesian(df_locations=df,
-                                            df_facilities=df2,
-                                            left_on=assigned_id_col,
-                                            right_on=id_col,
-                                            p=1.54,
-                                            distance_col=f'{col_prefix}_minkowski')
-
-    df = df.copy().drop(['x', 'y', 'z'], axis=1)
+    df[f'{col_prefix}_minkowski'] = minkowski_from_pairs(xy_ser, xy_ser2, nearest_indices, p=1.54)
 
     return df
 
@@ -178,19 +231,24 @@ def calculate_distance(cfg: Config,
     df_centers_in = df_centers.reset_index(drop=True)
 
     if len(df_clusters_in) > 0 and len(df_facilities) > 0:
+        # facilities coordinates are shared by households and centroids calculations
+        facility_xyz = cartesian_with_norms(df_facilities, res.facilities.xy_cols)
+        
         # calculate distance between households and df_facilities
         df_clusters = calculate_distance_df(df=df_clusters_in,
                                             xy_cols=res.clusters.xy_cols,
                                             df2=df_facilities,
                                             xy_cols2=res.facilities.xy_cols,
-                                            col_prefix='hh')
+                                            col_prefix='hh',
+                                            facility_xyz=facility_xyz)
         
         # calculate distance between cluster centroids and df_facilities
         df_centers = calculate_distance_df(df=df_centers_in,
                                            xy_cols=center_xy_cols,
                                            df2=df_facilities,
                                            xy_cols2=res.facilities.xy_cols,
-                                           col_prefix='village')
+                                           col_prefix='village',
+                                           facility_xyz=facility_xyz)
     else:
         df_clusters = df_clusters_in
         df_centers = df_centers_in
@@ -206,20 +264,25 @@ def calculate_distance(cfg: Config,
             # calculate distances
             gdf_loc.drop(columns=['geometry'], inplace=True)
             gdf_loc.reset_index(drop=True, inplace=True)
+            df_loc = pd.DataFrame(gdf_loc)
+            baseline_xy_cols = cfg.inputs.baseline_facilities.xy_cols
+            baseline_xyz = cartesian_with_norms(df_loc, baseline_xy_cols)
             
             # calculate distance between households and baseline df_facilities
             df_clusters = calculate_distance_df(df=df_clusters,
                                                 xy_cols=res.clusters.xy_cols,
-                                                df2=pd.DataFrame(gdf_loc),
-                                                xy_cols2=cfg.inputs.baseline_facilities.xy_cols,
-                                                col_prefix='baseline_hh')
+                                                df2=df_loc,
+                                                xy_cols2=baseline_xy_cols,
+                                                col_prefix='baseline_hh',
+                                                facility_xyz=baseline_xyz)
             
             # calculate distance between cluster centroids and baseline df_facilities
             df_centers = calculate_distance_df(df=df_centers,
                                                xy_cols=center_xy_cols,
-                                               df2=pd.DataFrame(gdf_loc),
-                                               xy_cols2=cfg.inputs.baseline_facilities.xy_cols,
-                                               col_prefix='baseline_village')
+                                               df2=df_loc,
+                                               xy_cols2=baseline_xy_cols,
+                                               col_prefix='baseline_village',
+                                               facility_xyz=baseline_xyz)
         else:
             cfg.results.logger.warning(f"Unable to find any baseline locations within adm2 boundary!: "
                                        f"{df_centers.head(1)[cfg.results.clusters.adm_cols].values}")
@@ -264,15 +327,7 @@ def plot_ecdf_distance(cfg: Config,
     # Calculate the ECDF values
     ecdf = np.arange(1, len(minkowski_distance) + 1) / len(minkowski_distance) * 100.0
 
-    plot_args = (minkowski_distance, ecdf, location, filename, final_properties)
-
-    if lock:
-        with lock:
-            res = plot_minkowski_distance(*plot_args)
-    else:
-        res = plot_minkowski_distance(*plot_args)
-
-    return res
+    return plot_minkowski_distance(minkowski_distance, ecdf, location, filename, final_properties)
 
 
 def plot_minkowski_distance(minkowski_distance: np.ndarray,
@@ -290,14 +345,72 @@ def plot_minkowski_distance(minkowski_distance: np.ndarray,
     :returns: bool: True if the plot is saved successfully, False otherwise.
     """
     final_properties = final_properties or {}
-    # Plotting the ECDF
-    plt.plot(minkowski_distance, ecdf, **final_properties)
-    plt.xlabel('Minkowski Distance (KM)')
-    plt.ylabel('Cumulative distribution %')
-    plt.title(f'Cumulative Distribution of Minkowski Distance {location}')
-    plt.grid(True)
+    
+    # Reuse a previously rendered plot of the same data, if available
+    cached_file = None
+    if filename is not None:
+        key = plot_cache_key(minkowski_distance, location, final_properties)
+        cached_file = util.memory_cache_dir() / "ecdf" / f"{key}.png"
+        if cached_file.is_file():
+            Path(filename).parent.mkdir(exist_ok=True, parents=True)
+            shutil.copy(cached_file, filename)
+            cached_file.touch()  # mark as recently used
+            return True
+    
+    # Plotting the ECDF (using a standalone figure, pyplot global state is not thread safe)
+    fig = Figure()
+    ax = fig.add_subplot(111)
+    ax.plot(minkowski_distance, ecdf, **final_properties)
+    ax.set_xlabel('Minkowski Distance (KM)')
+    ax.set_ylabel('Cumulative distribution %')
+    ax.set_title(f'Cumulative Distribution of Minkowski Distance {location}')
+    ax.grid(True)
     if filename is not None:
         Path(filename).parent.mkdir(exist_ok=True, parents=True)
-        plt.savefig(filename)
-    plt.close()
+        FigureCanvasAgg(fig).print_png(str(filename))
+        cached_file.parent.mkdir(exist_ok=True, parents=True)
+        # write to a temp file and move it into place, so concurrent runs never read a partial plot
+        fd, tmp_file = tempfile.mkstemp(suffix=".tmp", dir=cached_file.parent)
+        os.close(fd)
+        try:
+            shutil.copy(filename, tmp_file)
+            os.replace(tmp_file, cached_file)
+        except OSError:
+            Path(tmp_file).unlink(missing_ok=True)
+            raise
+        prune_plot_cache(cached_file.parent)
     return True
+
+
+def prune_plot_cache(cache_dir: Path, max_files: int = plot_cache_max_files) -> None:
+    """
+    Remove the least recently used plots from the plots cache, keeping at most `max_files`.
+    :param cache_dir: Path. The plots cache directory.
+    :param max_files: int. The maximum number of cached plots.
+    """
+    files = list(cache_dir.glob("*.png"))
+    if len(files) <= max_files:
+        return
+
+    def mtime(f: Path) -> float:
+        try:
+            return f.stat().st_mtime
+        except FileNotFoundError:  # removed by a concurrent prune
+            return 0.0
+
+    for f in sorted(files, key=mtime)[:len(files) - max_files]:
+        f.unlink(missing_ok=True)
+
+
+def plot_cache_key(minkowski_distance: np.ndarray, location: str, final_properties: dict) -> str:
+    """
+    Create a content hash key identifying an ECDF plot.
+    :param minkowski_distance: np.ndarray. The Minkowski distance values.
+    :param location: str: The location information included in the plot title.
+    :param final_properties: dict. The plot function keyword arguments.
+    :returns: str: The hex digest key.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(minkowski_distance, dtype=np.float64).tobytes())
+    h.update(f"{location}|{sorted(final_properties.items())}".encode('utf-8'))
+    return h.hexdigest()
@@ -4,10 +4,9 @@ import matplotlib
 matplotlib.use('agg')
 import warnings
 
-warnings.simplefilter(action='ignore', category=FutureWarning)
+warnings.filterwarnings(action='ignore', category=FutureWarning, module=__name__)
 
 from pathlib import Path
-from shapely import Polygon
 
 from deepfacility.utils import util, spatial
 
@@ -30,22 +29,18 @@ def create_clusters_shapes(cfg: Config,
     res: ResultsClusteredHouseholds = cfg.results.clusters
 
     cols = res.adm_cols + [res.data_cols[0]]   # admin and cluster columns
-    gdf = spatial.xy_to_gdf(df_clusters, res.xy_cols)     # convert to GeoDataFrame
-    gdf = gdf[cols + [geom_col]]               # select columns
-    gdf = gdf.dissolve(by=cols).reset_index()  # dissolve clusters to create shapes
     
     # create cluster shapes using convex hull
-    gdf[geom_col] = gdf.geometry.apply(spatial.point_to_polygon)
-    gdf[geom_col] = gdf.geometry.convex_hull
+    gdf = spatial.xy_to_hulls(df_clusters, res.xy_cols, cols)
 
     # Ensure village shapes are only within admin boundaries.
-    gdf = gpd.clip(gdf, gdf_adm_shape)
+    gdf = spatial.clip_to_shape(gdf, gdf_adm_shape)
 
     # join household counts
     cluster_col = res.data_cols[0]
     counts_col = 'counts'
-    counts_file = location_path(res.counts_file, location, mkdir=False)
-    df_cnt = pd.read_csv(counts_file, encoding='utf-8')[[cluster_col, counts_col]]
+    counts_file = spatial.location_data_path(res.counts_file, location, mkdir=False)
+    df_cnt = pd.read_parquet(counts_file, columns=[cluster_col, counts_col])
     gdf = gdf.merge(df_cnt, on=cluster_col)
     gdf = gdf[cols + [counts_col, geom_col]]
     gdf = util.rename_df_cols(gdf, 'counts', 'households')
@@ -54,13 +49,13 @@ def create_clusters_shapes(cfg: Config,
 
 def export_cluster_shapes(cluster_shapes: gpd.GeoDataFrame, shape_file: Path) -> gpd.GeoDataFrame:
     """
-    Export cluster shapes to shapefile.
+    Export cluster shapes to GeoParquet, an intermediate file merged into the final GeoJSON.
     :param cluster_shapes: cluster shapes
-    :param shape_file: output shape file
-    :return: shapefile path
+    :param shape_file: output GeoParquet file
+    :return: exported cluster shapes
     """
-    gdf = cluster_shapes[[isinstance(g, Polygon) for g in cluster_shapes.geometry]]
-    gdf.to_file(filename=shape_file, driver="ESRI Shapefile")
+    gdf = cluster_shapes[cluster_shapes.geom_type == "Polygon"]
+    gdf.to_parquet(shape_file, index=False)
     return gdf
 
 
@@ -91,15 +86,15 @@ def merge_results(cfg: Config, results: dict[str, ResultFiles]) -> ResultFiles:
 def merge_result_data(results: dict[str, ResultFiles]) -> ResultData:
     """
     Merge results data from multiple locations.
-    :param results: results from multiple locations
+    :param results: results from multiple locations (per-location data files are Parquet)
     :return: merged results data
     """
     # Concatenate dataframes
-    gdf_shapes: gpd.GeoDataFrame = gpd.GeoDataFrame(pd.concat([gpd.read_file(rf.shape_file) for rf in results.values()]))
-    df_clusters: pd.DataFrame = pd.concat([pd.read_csv(rf.clusters_file, encoding='utf-8') for rf in results.values()])
-    df_centers: pd.DataFrame = pd.concat([pd.read_csv(rf.centers_file, encoding='utf-8') for rf in results.values()])
-    df_counts:  pd.DataFrame = pd.concat([pd.read_csv(rf.counts_file, encoding='utf-8') for rf in results.values()])
-    df_facilities: pd.DataFrame = pd.concat([pd.read_csv(rf.facilities_file, encoding='utf-8') for rf in results.values()])
+    gdf_shapes: gpd.GeoDataFrame = gpd.GeoDataFrame(pd.concat([gpd.read_parquet(rf.shape_file) for rf in results.values()]))
+    df_clusters: pd.DataFrame = pd.concat([pd.read_parquet(rf.clusters_file) for rf in results.values()])
+    df_centers: pd.DataFrame = pd.concat([pd.read_parquet(rf.centers_file) for rf in results.values()])
+    df_counts:  pd.DataFrame = pd.concat([pd.read_parquet(rf.counts_file) for rf in results.values()])
+    df_facilities: pd.DataFrame = pd.concat([pd.read_parquet(rf.facilities_file) for rf in results.values()])
     
     # Sort dataframes
     gdf_shapes.sort_values(by=gdf_shapes.columns.to_list(), inplace=True)
@@ -5,7 +5,7 @@ import matplotlib
 
 matplotlib.use('agg')
 import warnings
-warnings.simplefilter(action='ignore', category=FutureWarning)
+warnings.filterwarnings(action='ignore', category=FutureWarning, module=__name__)
 
 from pathlib import Path
 
@@ -34,21 +34,22 @@ def place_facilities(cfg: Config, df_clusters: pd.DataFrame, location: str) -> p
     adm_cols = res.clusters.adm_cols
     xy_cols = res.clusters.xy_cols
     clusters_cols = adm_cols + [res.clusters.data_cols[0]]
+    n_facilities = res.facilities.n_facilities
 
     # Initialize village names from cluster ids
     df_clusters[village_col] = df_clusters[cluster_col]
  
-    # Group households by cluster (village) process each cluster
+    # Group households by cluster (village) process each cluster,
+    # grouping by categorical columns to hash each admin name only once
+    df_groups = df_clusters.astype({c: 'category' for c in clusters_cols})
     optimal_facilities = []
-    for i, dat in df_clusters.groupby(clusters_cols):
+    for i, dat in df_groups.groupby(clusters_cols, observed=True):
         # Prepare data for clustering
-        x = np.array(dat[xy_cols[0]])
-        y = np.array(dat[xy_cols[1]])
-        X = np.array(list(zip(x, y))).reshape(len(x), 2)
+        X = dat[xy_cols].to_numpy(dtype=np.float64)
 
         # Cluster points if possible
         if X.shape[0] >= 3:
-            kmeans_model = spatial.kmeans_fit(X, res.facilities.n_facilities)
+            kmeans_model = spatial.kmeans_fit(X, n_facilities)
             centers = np.array(kmeans_model.cluster_centers_)
             if kmeans_model.n_iter_ == kmeans_model.max_iter:
                 cfg.results.logger.warning(f"Clustering facilities didn't converge for: {location}")
@@ -56,7 +57,7 @@ def place_facilities(cfg: Config, df_clusters: pd.DataFrame, location: str) -> p
             centers = X
 
         # Create a dataframe of optimal facilities
-        df = pd.DataFrame(centers, columns=res.clusters.xy_cols)
+        df = pd.DataFrame(centers, columns=xy_cols)
         df[village_col] = i[-1]  # use cluster label as a village name
 
         # Add admin names
@@ -69,7 +70,7 @@ def place_facilities(cfg: Config, df_clusters: pd.DataFrame, location: str) -> p
     
     # Merge optimal placements all clusters, add Google plus codes and id column
     df_of: pd.DataFrame = pd.concat(optimal_facilities)[adm_cols + [village_col] + xy_cols].copy()
-    df_of["plus"] = df_of.apply(lambda r: spatial.get_plus_code(r.lon, r.lat), axis=1)
+    df_of["plus"] = spatial.get_plus_codes(df_of[xy_cols[0]].to_numpy(), df_of[xy_cols[1]].to_numpy())
     unique_ids = [f"{location}_{i}" for i in range(len(df_of))]
     df_of['facility_id'] = unique_ids
     df_of.reset_index(drop=True, inplace=True)
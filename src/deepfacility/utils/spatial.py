@@ -1,15 +1,27 @@
+from __future__ import annotations
+
 import geopandas as gpd
+import hashlib
+import numpy as np
 import pandas as pd
-import pycountry
-
+import re
+import shapely
+import threading
+
+from collections import OrderedDict
+from functools import lru_cache
+from geopandas.array import GeometryDtype
+from openlocationcode import openlocationcode as olc
 from pathlib import Path
 from pyproj import CRS
 from shapely import Geometry, Polygon
-from sklearn.cluster import KMeans
-from typing import Any
+from typing import TYPE_CHECKING, Any, Literal
 
 from deepfacility.utils import util
 
+if TYPE_CHECKING:
+    from sklearn.cluster import KMeans
+
 
 # Frequently used spatial global variables
 geom_col = 'geometry'
@@ -17,9 +29,26 @@ default_crs: CRS = CRS("EPSG:4326")
 default_projected_crs: CRS = CRS("EPSG:3857")
 
 
+# Location names separator, with surrounding spaces to normalize
+location_sep_pattern = re.compile(r"\s*:\s*")
+
+# Plus codes constants used by the vectorized encoder
+olc_alphabet = np.array(list(olc.CODE_ALPHABET_))
+olc_lat_precision = olc.computeLatitudePrecision(olc.PAIR_CODE_LENGTH_)
+olc_lat_grid = olc.GRID_ROWS_ ** olc.GRID_CODE_LENGTH_
+olc_lon_grid = olc.GRID_COLUMNS_ ** olc.GRID_CODE_LENGTH_
+
+
 # Initialize data cache
 memory = util.memory_cache()
 
+# In-process spatial join cache, used for inputs smaller than the disk cache threshold
+join_cache: OrderedDict[tuple, tuple[gpd.GeoDataFrame, int]] = OrderedDict()
+join_cache_lock = threading.Lock()
+join_cache_max_bytes = 256 * 1024 * 1024  # total size of the cached join results
+join_cache_nbytes = 0
+join_cache_min_disk_bytes = 50 * 1024 * 1024
+
 
 def location_parts(location: str):
     """Split location string into parts."""
@@ -33,7 +62,14 @@ def locations_to_dataframe(locations: list[str], columns: list[str]):
     :param columns: columns
     :return: DataFrame
     """
-    return pd.DataFrame([location_parts(c) for c in locations], columns=columns)
+    if len(locations) == 0:
+        return pd.DataFrame(columns=columns)
+    
+    # Split all locations at once using vectorized string operations
+    df = pd.Series(locations, dtype=object).str.strip().str.split(":", expand=True)
+    df = df.reindex(columns=range(len(columns)))
+    df.columns = columns
+    return df
 
 
 def filter_locations(df: pd.DataFrame, locations: list[str], columns: list[str]):
@@ -44,14 +80,24 @@ def filter_locations(df: pd.DataFrame, locations: list[str], columns: list[str])
     :param columns: columns
     :return: filtered DataFrame
     """
-    # Convert locations to DataFrame
-    df2: pd.DataFrame = locations_to_dataframe(locations, columns=columns)
-    df2 = util.clean_dataframe(df2)
-    df2 = df2.drop_duplicates()
-    assert util.has_cols(df=df, columns=columns) and util.has_cols(df=df2, columns=columns)
+    assert util.has_cols(df=df, columns=columns)
+    if len(locations) == 0 or df.empty:
+        return df.iloc[0:0].reset_index(drop=True)
+    
+    # Clean locations the same way as admin names, and normalize spaces around separators
+    keys = util.clean_series(pd.Series(locations, dtype=object)).str.replace(location_sep_pattern, ":", regex=True)
     
-    # Filter by joining with locations dataframe
-    df_res = pd.merge(df, df2, on=columns)
+    # Filter by matching admin columns, as a natural key, against the set of locations
+    df_loc = locations_to_dataframe(keys.tolist(), columns)
+    if len(columns) == 1:
+        # Match the distinct names only, then map back to rows by their codes (-1 for missing names)
+        codes, names = pd.factorize(df[columns[0]])
+        matched = pd.Index(names).astype(str).isin(set(df_loc[columns[0]]))
+        mask = np.append(matched, False)[codes]
+    else:
+        df_index = pd.MultiIndex.from_frame(df[columns].astype(str))
+        mask = df_index.isin(pd.MultiIndex.from_frame(df_loc))
+    df_res = df[mask].reset_index(drop=True)
     return df_res
 
 
@@ -63,21 +109,24 @@ def location_path(pattern: Path, location: str, mkdir: bool = True) -> Path:
     :param mkdir: create directory if not exists
     :return: file path
     """
-    # Cleanup and populate file pattern with location
-    pattern = str(pattern)
-    loc_path = location.replace(":", "/")
-    if '{location}' in pattern:
-        file = str(pattern).format(location=loc_path)
-    else:
-        file = str(pattern)
-    
-    # Convert to Path
-    file = Path(file)
+    # Populate file pattern with location, as nested directories
+    file = Path(str(pattern).replace("{location}", location.replace(":", "/")))
     if mkdir:
         util.make_dir(file)
     return file
 
 
+def location_data_path(pattern: Path, location: str, mkdir: bool = True) -> Path:
+    """
+    Create per-location intermediate data file path. Intermediate data is stored as Parquet.
+    :param pattern: file path pattern
+    :param location: location
+    :param mkdir: create directory if not exists
+    :return: file path
+    """
+    return location_path(pattern, location, mkdir=mkdir).with_suffix('.parquet')
+
+
 def point_to_polygon(g: Geometry):
     """Convert point geometry to a polygon geometry."""
     return Polygon(g.buffer(0.00001, cap_style=3)) if g.type == "Point" else g
@@ -90,27 +139,211 @@ def xy_to_gdf(df: pd.DataFrame, xy_cols) -> gpd.GeoDataFrame:
     :param xy_cols: columns with x, y coordinates
     :return: GeoDataFrame
     """
-    gdf = gpd.GeoDataFrame(data=df,
-                           geometry=gpd.points_from_xy(df[xy_cols[0]], df[xy_cols[1]]),
-                           crs=default_crs)
-    gdf = gdf.dropna()
+    # Drop incomplete rows before creating points, to avoid creating points to be discarded
+    mask = df.notna().all(axis=1).to_numpy()
+    if not mask.all():
+        df = df[mask]
+    xy = df[list(xy_cols)].to_numpy(dtype=np.float64)
+    gdf = gpd.GeoDataFrame(data=df, geometry=shapely.points(xy), crs=default_crs)
     return gdf
 
 
-@memory.cache
-def join_xy_shapes(df: pd.DataFrame, xy_cols: list[str], gdf: gpd.GeoDataFrame, predicate: str = "within") -> gpd.GeoDataFrame:
+def xy_to_hulls(df: pd.DataFrame, xy_cols: list[str], group_cols: list[str]) -> gpd.GeoDataFrame:
+    """
+    Create convex hull shapes from points grouped by columns.
+    Single point groups are converted to small square polygons.
+    :param df: DataFrame
+    :param xy_cols: columns with x, y coordinates
+    :param group_cols: columns to group points by
+    :return: GeoDataFrame with group columns and hull shapes
+    """
+    df = df[group_cols + xy_cols].dropna()
+    groups = df.groupby(by=group_cols, sort=True)
+    keys = groups.size().index.to_frame(index=False)
+
+    # Collect points of each group into a multipoint (indices must be sorted)
+    codes = groups.ngroup().to_numpy()
+    order = np.argsort(codes, kind="stable")
+    points = shapely.points(df[xy_cols].to_numpy(dtype=np.float64)[order])
+    multipoints = shapely.multipoints(points, indices=codes[order])
+
+    # Create hulls and convert single points to polygons
+    hulls = shapely.convex_hull(multipoints)
+    is_point = shapely.get_type_id(hulls) == shapely.GeometryType.POINT
+    hulls[is_point] = shapely.buffer(hulls[is_point], 0.00001, cap_style="square")
+
+    return gpd.GeoDataFrame(data=keys, geometry=hulls, crs=default_crs)
+
+
+def clip_to_shape(gdf: gpd.GeoDataFrame, gdf_mask: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """
+    Clip geometries to the union of mask shapes, dropping empty results.
+    :param gdf: GeoDataFrame to clip
+    :param gdf_mask: GeoDataFrame with mask shapes
+    :return: clipped GeoDataFrame
+    """
+    mask = shapely.union_all(gdf_mask.to_crs(gdf.crs).geometry.to_numpy())
+    clipped = shapely.intersection(gdf.geometry.to_numpy(), mask)
+    gdf = gdf.set_geometry(clipped, crs=gdf.crs)
+    return gdf[~shapely.is_empty(clipped)]
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """
+    Calculate DataFrame or GeoDataFrame content hash, used as a cheap cache key instead of pickling the data.
+    :param df: DataFrame or GeoDataFrame
+    :return: hash string
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((df.shape, df.columns.to_list(), df.dtypes.astype(str).to_list())).encode())
+    
+    # Hash geometries as WKB, other columns with pandas vectorized hashing
+    geo_cols = [c for c in df.columns if isinstance(df[c].dtype, GeometryDtype)]
+    for c in geo_cols:
+        h.update(b"".join(shapely.to_wkb(df[c].to_numpy())))
+    h.update(pd.util.hash_pandas_object(df.drop(columns=geo_cols), index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class CachedSjoin:
+    """
+    Spatial join against a fixed set of shapes.
+    Builds the shapes spatial index once and reuses it for each joined set of points.
+    """
+    gdf: gpd.GeoDataFrame
+    key: str
+
+    def __init__(self, gdf: gpd.GeoDataFrame):
+        self.gdf: gpd.GeoDataFrame = gdf   # shapes GeoDataFrame
+        self.key: str = frame_hash(gdf)    # shapes data content key
+        self._tree: shapely.STRtree = shapely.STRtree(gdf.geometry.to_numpy())
+
+    def query_points(self, x: np.ndarray, y: np.ndarray, predicate: str = "within") -> tuple[np.ndarray, np.ndarray]:
+        """
+        Query shapes matching the points.
+        :param x: points x coordinates
+        :param y: points y coordinates
+        :param predicate: spatial predicate, evaluated as `predicate(point, shape)`
+        :return: points indices, shapes indices
+        """
+        pt_idx, shp_idx = self._tree.query(shapely.points(x, y), predicate=predicate)
+        return pt_idx, shp_idx
+
+    def query(self, geom: Geometry, predicate: str = "within") -> np.ndarray:
+        """
+        Query shapes matching a single geometry.
+        :param geom: geometry
+        :param predicate: spatial predicate, evaluated as `predicate(geom, shape)`
+        :return: shapes indices
+        """
+        return self._tree.query(geom, predicate=predicate)
+
+    def join_xy(self, df: pd.DataFrame, xy_cols: list[str], predicate: str = "within") -> gpd.GeoDataFrame:
+        """
+        Join DataFrame with xy columns to the shapes, equivalent to `gpd.sjoin(points, shapes)`.
+        :param df: DataFrame
+        :param xy_cols: xy columns
+        :param predicate: spatial predicate, evaluated as `predicate(point, shape)`
+        :return: GeoDataFrame with points and matched shapes columns
+        """
+        gdf_pts = xy_to_gdf(df, xy_cols)
+        pt_idx, shp_idx = self._tree.query(gdf_pts.geometry.to_numpy(), predicate=predicate)
+        order = np.lexsort((shp_idx, pt_idx))
+        pt_idx, shp_idx = pt_idx[order], shp_idx[order]
+
+        # Rename overlapping columns the same way sjoin does
+        df_shp = pd.DataFrame(self.gdf.drop(columns=self.gdf.geometry.name))
+        common = set(gdf_pts.columns).intersection(df_shp.columns)
+        gdf_pts = gdf_pts.rename(columns={c: f"{c}_left" for c in common})
+        df_shp = df_shp.rename(columns={c: f"{c}_right" for c in common})
+
+        shp_cols = {"index_right": df_shp.index.to_numpy()[shp_idx]}
+        shp_cols.update({c: df_shp[c].to_numpy()[shp_idx] for c in df_shp.columns})
+        return gdf_pts.iloc[pt_idx].assign(**shp_cols)
+
+
+def cache_join(key: tuple, frames: list[pd.DataFrame], join_fn: callable, disk_join_fn: callable, *args) -> gpd.GeoDataFrame:
+    """
+    Cache spatial join results in process memory, or on disk for large inputs.
+    Small joins are cheaper to recompute than to pickle to and from the disk cache.
+    :param key: data content key identifying the join
+    :param frames: join input frames, used to determine the input size
+    :param join_fn: join function
+    :param disk_join_fn: disk cached join function
+    :param args: join function arguments
+    :return: joined GeoDataFrame
+    """
+    nbytes = sum(int(f.memory_usage(index=True).sum()) for f in frames)
+    if nbytes >= join_cache_min_disk_bytes:
+        return disk_join_fn(*args, key=key)
+
+    global join_cache_nbytes
+    with join_cache_lock:
+        entry = join_cache.get(key)
+        if entry is not None:
+            join_cache.move_to_end(key)
+
+    if entry is not None:
+        gdf = entry[0]
+    else:
+        gdf = join_fn(*args, key=key)
+        gdf_nbytes = geodataframe_nbytes(gdf)
+        with join_cache_lock:
+            if gdf_nbytes <= join_cache_max_bytes and key not in join_cache:
+                join_cache[key] = (gdf, gdf_nbytes)
+                join_cache_nbytes += gdf_nbytes
+                while join_cache_nbytes > join_cache_max_bytes:
+                    _, (_, evicted_nbytes) = join_cache.popitem(last=False)
+                    join_cache_nbytes -= evicted_nbytes
+
+    return gdf.copy()
+
+
+def geodataframe_nbytes(gdf: gpd.GeoDataFrame) -> int:
+    """
+    Estimate GeoDataFrame memory size, including the coordinates of its geometries.
+    :param gdf: GeoDataFrame
+    :return: size in bytes
+    """
+    nbytes = int(gdf.memory_usage(index=True, deep=True).sum())
+    for col in gdf.columns[gdf.dtypes == "geometry"]:
+        nbytes += int(shapely.get_num_coordinates(gdf[col].array).sum()) * 16  # two float64 per coordinate
+    return nbytes
+
+
+def join_xy_shapes(df: pd.DataFrame,
+                   xy_cols: list[str],
+                   gdf: gpd.GeoDataFrame | CachedSjoin,
+                   predicate: str = "within") -> gpd.GeoDataFrame:
     """
     Join DataFrame with xy columns to GeoDataFrame. Returns filtered points as GeoDataFrame.
     :param df: DataFrame
     :param xy_cols: xy columns
-    :param gdf: GeoDataFrame
+    :param gdf: GeoDataFrame, or CachedSjoin to reuse the shapes spatial index across calls
     :param predicate: Spatial join predicate
     """
+    if isinstance(gdf, CachedSjoin):
+        shapes_key, shapes_df = gdf.key, gdf.gdf
+    else:
+        shapes_key, shapes_df = frame_hash(gdf), gdf
+
+    key = ("join_xy_shapes", frame_hash(df), shapes_key, tuple(xy_cols), predicate)
+    return cache_join(key, [df, shapes_df], _join_xy_shapes, _join_xy_shapes_disk, df, xy_cols, gdf, predicate)
+
+
+def _join_xy_shapes(df: pd.DataFrame,
+                    xy_cols: list[str],
+                    gdf: gpd.GeoDataFrame | CachedSjoin,
+                    predicate: str,
+                    key: tuple) -> gpd.GeoDataFrame:
+    """Uncached `join_xy_shapes`, the `key` identifies the data content in the disk cache."""
+    if isinstance(gdf, CachedSjoin):
+        return gdf.join_xy(df, xy_cols, predicate=predicate)
+
     gdf_pts = xy_to_gdf(df, xy_cols)
     return gpd.sjoin(gdf_pts, gdf, predicate=predicate)
 
 
-@memory.cache
 def join_shapes_xy(gdf: gpd.GeoDataFrame,
                    df: pd.DataFrame,
                    xy_cols: list[str],
@@ -123,10 +356,41 @@ def join_shapes_xy(gdf: gpd.GeoDataFrame,
     :param predicate: Spatial join predicate
     :return: GeoDataFrame with shapes
     """
+    key = ("join_shapes_xy", frame_hash(gdf), frame_hash(df), tuple(xy_cols), predicate)
+    return cache_join(key, [gdf, df], _join_shapes_xy, _join_shapes_xy_disk, gdf, df, xy_cols, predicate)
+
+
+def _join_shapes_xy(gdf: gpd.GeoDataFrame, df: pd.DataFrame, xy_cols: list[str], predicate: str, key: tuple) -> gpd.GeoDataFrame:
+    """Uncached `join_shapes_xy`, the `key` identifies the data content in the disk cache."""
     gdf_pts = xy_to_gdf(df, xy_cols)
     return gpd.sjoin(gdf, gdf_pts, predicate=predicate)
 
 
+# Disk cached joins, identified by the data content `key` instead of the data
+_join_xy_shapes_disk = memory.cache(_join_xy_shapes, ignore=['df', 'gdf'])
+_join_shapes_xy_disk = memory.cache(_join_shapes_xy, ignore=['gdf', 'df'])
+
+
+@lru_cache(maxsize=1)
+def country_shapes() -> gpd.GeoDataFrame:
+    """
+    Read GeoPandas built-in country shapes, once per process.
+    The returned GeoDataFrame is shared, do not modify it.
+    :return: GeoDataFrame with country names, ISO codes and shapes
+    """
+    gdf_shp = gpd.read_file(gpd.datasets.get_path("naturalearth_lowres"), engine="pyogrio")
+    return gdf_shp[['name', 'iso_a3', 'gdp_md_est', 'geometry']]
+
+
+@lru_cache(maxsize=1)
+def country_shapes_sjoin() -> CachedSjoin:
+    """
+    Create spatial join of the built-in country shapes, once per process.
+    :return: CachedSjoin with country shapes, indexed in the `country_shapes` order
+    """
+    return CachedSjoin(country_shapes())
+
+
 def detect_country(df, xy_cols: list[str]):
     """
     Detect country from DataFrame with xy columns.
@@ -141,22 +405,40 @@ def detect_country(df, xy_cols: list[str]):
     if xy_cols[0] not in df.columns or xy_cols[1] not in df.columns:
         raise KeyError("Longitude and latitude columns are not found")
     
-    # Read GeoPandas built-in country shapes
-    gdf_shp = gpd.read_file(gpd.datasets.get_path("naturalearth_lowres"))
-    gdf_shp = gdf_shp[['name', 'iso_a3', 'gdp_md_est', 'geometry']]
+    # Get GeoPandas built-in country shapes and their spatial index
+    gdf_shp = country_shapes()
+    sjoin = country_shapes_sjoin()
 
-    # Determine the country by spatially joining country shapes with village
+    # Determine the country by querying country shapes containing village
     # centers and taking the country containing the most village centers.
-    gdf = join_shapes_xy(gdf_shp, df[xy_cols], xy_cols)
-    gdf = gdf.groupby(['name', 'iso_a3']).size().to_frame(name='count')
-    gdf = gdf.sort_values(by='count', ascending=False).head(n=1)
-
-    name, code = gdf.iloc[0].name
+    xy = df[xy_cols].dropna().to_numpy(dtype=np.float64)
+    if len(xy) == 0:
+        raise IndexError("No country contains the given locations")
+
+    # A single lookup suffices when one country contains the envelope of all points
+    shp_idx = sjoin.query(shapely.envelope(shapely.multipoints(xy)), predicate="within")
+    if len(shp_idx) == 0:
+        _, shp_idx = sjoin.query_points(xy[:, 0], xy[:, 1], predicate="within")
+    if len(shp_idx) == 0:
+        raise IndexError("No country contains the given locations")
+
+    counts = np.bincount(shp_idx, minlength=len(gdf_shp))
+    code = gdf_shp['iso_a3'].iat[counts.argmax()]
     # Get the standardized country name and ISO code
+    return iso_country_name(code), code
+
+
+@lru_cache(maxsize=256)
+def iso_country_name(code: str) -> str:
+    """
+    Look up the standardized country name of an ISO code, once per code.
+    :param code: ISO 3166-1 alpha-3 country code
+    :return: country name
+    """
+    import pycountry  # imported on use, it loads the full ISO database
     cnt = pycountry.countries.search_fuzzy(code)[0]
     assert code == cnt.alpha_3, "ISO code is not valid"
-
-    return cnt.name, code
+    return cnt.name
 
  
 def get_plus_code(longitude: float, latitude: float) -> str:
@@ -166,38 +448,71 @@ def get_plus_code(longitude: float, latitude: float) -> str:
     :param longitude: longitude
     :return: plus code string
     """
-    from openlocationcode import openlocationcode as olc
     code = olc.encode(latitude, longitude)
     return code
 
 
+def get_plus_codes(longitudes: np.ndarray, latitudes: np.ndarray) -> np.ndarray:
+    """
+    Generates Google Plus Codes (10 digits, same as `get_plus_code`) for arrays of coordinates.
+    :param longitudes: longitudes
+    :param latitudes: latitudes
+    :return: array of plus code strings
+    """
+    lon = np.asarray(longitudes, dtype=np.float64)
+    lat = np.clip(np.asarray(latitudes, dtype=np.float64), -90, 90)
+    lon = np.where((lon < -180) | (lon >= 180), np.mod(lon + 180, 360) - 180, lon)
+    lat = np.where(lat == 90, lat - olc_lat_precision, lat)
+
+    # Convert to positive integers at the pair digits precision
+    lat_val = np.floor(np.round((lat + 90) * olc.FINAL_LAT_PRECISION_, 6)).astype(np.int64) // olc_lat_grid
+    lon_val = np.floor(np.round((lon + 180) * olc.FINAL_LNG_PRECISION_, 6)).astype(np.int64) // olc_lon_grid
+
+    # Extract base 20 digits, pairs of latitude and longitude digits from the last one
+    digits = np.empty((len(lat_val), olc.PAIR_CODE_LENGTH_), dtype=np.int64)
+    for i in range(olc.PAIR_CODE_LENGTH_ - 2, -1, -2):
+        lat_val, digits[:, i] = np.divmod(lat_val, olc.ENCODING_BASE_)
+        lon_val, digits[:, i + 1] = np.divmod(lon_val, olc.ENCODING_BASE_)
+
+    # Map digits to characters and insert the separator
+    chars = olc_alphabet[digits]
+    chars = np.insert(chars, olc.SEPARATOR_POSITION_, olc.SEPARATOR_, axis=1)
+    return np.ascontiguousarray(chars).view(f"<U{chars.shape[1]}")[:, 0].astype(object)
+
+
 def create_geojson(file: Path,
                    output_prefix: str,
                    working_dir: Path,
                    lon: str = None,
                    lat: str = None,
-                   rename_geocol: bool = False) -> Path:
+                   rename_geocol: bool = False,
+                   output_format: Literal['geojson', 'geoparquet'] = 'geojson') -> Path:
     """
-    Create GeoJSON file from CSV or SHP file.
+    Create GeoJSON (or GeoParquet) file from CSV or SHP file.
     :param file: input file
     :param output_prefix: output file prefix
     :param working_dir: working directory
     :param lon: longitude column
     :param lat: latitude column
     :param rename_geocol: rename columns to "lon", "lat"
-    :return: GeoJSON file
+    :param output_format: 'geojson' for GeoJSON, 'geoparquet' for compressed GeoParquet (for Parquet readers)
+    :return: GeoJSON (or GeoParquet) file
     """
+    if output_format not in ['geojson', 'geoparquet']:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
     # Create output GeoJSON file path
-    geojson_filename = working_dir / (output_prefix + ".geojson")
+    suffix = ".geojson" if output_format == 'geojson' else ".parquet"
+    geojson_filename = working_dir / (output_prefix + suffix)
 
     if file.suffix == '.csv':
         # Read CSV file and convert to GeoDataFrame
         assert lon is not None and lat is not None
-        df = pd.read_csv(file, encoding='utf-8')
-        gdf = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df[lon], df[lat]), crs="EPSG:4326")
+        df = pd.read_csv(file, encoding='utf-8', engine='pyarrow')
+        gdf = gpd.GeoDataFrame(df, geometry=shapely.points(df[lon].to_numpy(dtype=np.float64), df[lat].to_numpy(dtype=np.float64)), crs=default_crs)
     elif file.suffix == '.shp':
         # Read SHP file
-        gdf = gpd.read_file(file, crs="EPSG:4326")
+        gdf = gpd.read_file(file, crs="EPSG:4326", engine="pyogrio", use_arrow=True)
     else:
         raise NotImplementedError(f'file extension not supported! {file.name}')
     
@@ -205,22 +520,35 @@ def create_geojson(file: Path,
     if rename_geocol:
         gdf = util.rename_df_cols(gdf, [lon, lat], ['lon', 'lat'])
     
-    # Write to GeoJSON file
-    gdf.to_file(geojson_filename, driver='GeoJSON')
+    # Write to GeoJSON or GeoParquet file
+    if output_format == 'geojson':
+        gdf.to_file(geojson_filename, driver='GeoJSON', engine="pyogrio")
+    else:
+        gdf.to_parquet(geojson_filename, compression='zstd')
     
     return geojson_filename
 
 
 @memory.cache
-def kmeans_fit(X: Any, n_clusters: int, **kwargs) -> KMeans:
+def kmeans_fit(X: Any, n_clusters: int, backend: Literal['sklearn', 'minibatch'] = 'sklearn', **kwargs) -> KMeans:
     """
     Create and fit the KMeans model.
     :param X: data
     :param n_clusters: number of clusters
+    :param backend: 'sklearn' for full batch KMeans, 'minibatch' for MiniBatchKMeans (faster on large data)
     :param kwargs: additional arguments
     :return: KMeans model
     """
-    kmeans_model: KMeans = KMeans(n_clusters=n_clusters, **kwargs)
+    # Imported on use, scikit-learn import is slow and only needed for clustering
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+    if backend == 'minibatch':
+        kwargs.setdefault('batch_size', 4096)
+        kmeans_model = MiniBatchKMeans(n_clusters=n_clusters, **kwargs)
+    elif backend == 'sklearn':
+        kmeans_model = KMeans(n_clusters=n_clusters, **kwargs)
+    else:
+        raise ValueError(f"Unsupported KMeans backend: {backend}")
+    
     kmeans_model.fit(X)
     return kmeans_model
-    
\ No newline at end of file
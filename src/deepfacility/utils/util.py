@@ -1,4 +1,5 @@
 import hashlib
+import io
 import joblib
 import logging
 import logging.handlers
@@ -7,12 +8,16 @@ import pandas as pd
 import re
 import requests
 import shutil
+import string
 import tempfile
 import time
 import unicodedata
 import zipfile
 
+from functools import lru_cache
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from uuid import uuid4
 
 from unidecode import unidecode
@@ -27,8 +32,30 @@ def hash_str(v: str, max_len: int = None):
     return hsh
 
 
+def hash_strs(parts: list[str], max_len: int = None):
+    """Calculate the MD5 hash of concatenated strings, without building the concatenated string."""
+    h = hashlib.md5()
+    for p in parts:
+        h.update(str(p).encode())
+
+    hsh = h.hexdigest()
+    if max_len:
+        hsh = hsh[:max_len]
+
+    return hsh
+
+
 # String helpers
 
+# Translation table deleting ascii characters not allowed in ids
+id_chars = set(string.ascii_letters + string.digits + '_-')
+id_delete_table = str.maketrans('', '', ''.join(c for c in map(chr, range(128)) if c not in id_chars))
+
+# Precompiled patterns for frequently called string helpers
+spaces_pattern = re.compile('[ ]+')
+dirty_pattern = re.compile(r"[^\x00-\x7F]|'")  # non-ascii characters or apostrophes
+
+
 def strip_accents(text: str) -> str:
     """Strip accents from input String."""
     text = text.strip()
@@ -43,27 +70,37 @@ def text_to_id(text: str) -> str:
     """Convert input text to id."""
     text = str(text)
     text = strip_accents(text)
-    text = re.sub('[ ]+', '_', text)
-    text = re.sub('[^0-9a-zA-Z_-]', '', text)
+    text = spaces_pattern.sub('_', text)
+    text = text.translate(id_delete_table)  # text is ascii after strip_accents
     return text
 
 
-def clean_series(series: pd.Series) -> pd.Series:
+def clean_series(series: pd.Series, verbose: bool = False) -> pd.Series:
     """Clean a Series."""
+    series_str = series.astype("str").str.strip()  # Ensure all entries are strings, strip spaces
+
+    # Only non-ascii values and values with apostrophes need cleaning
+    unique_values = pd.Series(series_str.unique(), dtype=object)
+    dirty = unique_values[unique_values.str.contains(dirty_pattern, regex=True)]
+    if len(dirty) == 0:
+        return series_str
+
+    # Clean each dirty unique value only once, then map back to all entries
     # -> unidecode -> normalize -> encode -> decode -> replace
-    new_series = (series
-                  .astype("str")  # Ensure all entries are strings
-                  .str.strip()  # Strip leading and trailing spaces
-                  .apply(unidecode)  # Remove accents
-                  .str.normalize('NFKD')  # Normalize unicode
-                  .str.encode('ascii', errors='ignore')  # Encode to ascii
-                  .str.decode('utf-8')  # Decode to utf-8
-                  .str.replace("'", ""))  # Remove apostrophes
-    # Detect if any entries are difference after cleaning
-    # TODO: remove below
-    not_na = ~pd.isna(series)
-    diff = series[not_na][series[not_na] != new_series[not_na]]
-    if len(diff) > 0:
+    cleaned_values = (dirty
+                      .apply(unidecode)  # Remove accents
+                      .str.normalize('NFKD')  # Normalize unicode
+                      .str.encode('ascii', errors='ignore')  # Encode to ascii
+                      .str.decode('utf-8')  # Decode to utf-8
+                      .str.replace("'", ""))  # Remove apostrophes
+    mapping = dict(zip(unique_values, unique_values))
+    mapping.update(zip(dirty, cleaned_values))
+    new_series = series_str.map(mapping)
+
+    if verbose:
+        # Report the number of entries changed by cleaning
+        not_na = ~pd.isna(series)
+        diff = series[not_na][series[not_na] != new_series[not_na]]
         print(f"Fixed {len(diff)} entries.")
 
     return new_series
@@ -123,6 +160,19 @@ def rename_df_cols(df: pd.DataFrame | gdp.GeoDataFrame,
 
 # Download helpers
 
+def http_session() -> requests.Session:
+    """Create an HTTP session with connection pooling and retries of failed connections."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.5))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Shared HTTP session, reusing connections across downloads from the same host
+download_session = http_session()
+
+
 def download_url(url: str, download_dir: Path) -> Path:
     """Download a file from a URL."""
     assert len(url.strip()) > 0, "Download URL must be provided."
@@ -136,16 +186,19 @@ def download_url(url: str, download_dir: Path) -> Path:
     if not file.is_file():
         # Download the URL into the file if it doesn't already exist
         print(f"Downloading {name} into {str(download_dir)}")
-        r = requests.get(url, allow_redirects=True)
-        if r.status_code == 200:
-            # If OK, write the content to the file
-            make_dir(file)
-            with open(file, "wb") as f:
-                f.write(r.content)
-            print(f"Download of {name} complete.")
-        else:
-            # If not OK, log the error
-            file = None
+        with download_session.get(url, allow_redirects=True, stream=True, timeout=30) as r:
+            if r.status_code == 200:
+                # If OK, stream the content to a partial file in chunks, then rename it
+                make_dir(file)
+                part_file = file.with_name(f"{file.name}.part")
+                with open(part_file, "wb") as f:
+                    for chunk in r.iter_content(chunk_size=1 << 20):
+                        f.write(chunk)
+                part_file.replace(file)
+                print(f"Download of {name} complete.")
+            else:
+                # If not OK, log the error
+                file = None
     else:
         print(f"Skipping download, file already exists: {name}")
 
@@ -167,6 +220,54 @@ def has_cols(df: pd.DataFrame, columns: list[str]):
     return all([c in df.columns.values for c in columns])
 
 
+# File content helpers, cached in memory until the file is modified
+
+@lru_cache(maxsize=32)
+def _read_lines_cached(file: str, mtime_ns: int) -> tuple[str, ...]:
+    """Read text file lines, cached by file path and modification time."""
+    return tuple(Path(file).read_text().splitlines())
+
+
+def read_lines_cached(file: Path) -> list[str]:
+    """Read text file lines, cached in memory until the file is modified."""
+    return list(_read_lines_cached(str(file), Path(file).stat().st_mtime_ns))
+
+
+def count_newlines(file: Path, chunk_size: int = 1 << 16) -> int:
+    """Count line breaks in a file, reading it in chunks without decoding it."""
+    count = 0
+    with open(file, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            count += chunk.count(b'\n')
+
+    return count
+
+
+def tail_lines(file: Path, n: int = 30, block_size: int = 4096) -> list[str]:
+    """
+    Read the last lines of a text file, reading blocks backwards from the end of the file.
+    :param file: text file
+    :param n: number of lines
+    :param block_size: size of blocks read at a time
+    :return: last `n` lines
+    """
+    with open(file, 'rb') as f:
+        pos = f.seek(0, 2)
+        blocks = []
+        line_count = 0
+        # One more line break than lines is needed to make sure the first line is complete
+        while line_count <= n and pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            blocks.append(block)
+            line_count += block.count(b'\n')
+
+    data = b''.join(reversed(blocks))
+    return data.decode('utf-8', errors='replace').splitlines()[-n:] if n > 0 else []
+
+
 # Path helpers
 
 def make_dir(f: Path):
@@ -205,13 +306,26 @@ def letters(loc: str, z):
     return ''.join([s[0:z] for s in loc.split(':')])
 
 
+def letters_many(locs: list[str], z) -> list[str]:
+    """Get the first z letters of each location, same as `letters` for a list of locations"""
+    if len(locs) == 0:
+        return []
+
+    # Split all locations at once and concatenate prefixes of the parts column by column
+    parts = pd.Series(locs, dtype=object).str.split(':', expand=True)
+    res = parts[0].str[0:z]
+    for c in parts.columns[1:]:
+        res = res + parts[c].str[0:z].fillna('')
+    return res.tolist()
+
+
 def format_run_name(locations: list[str]) -> str:
     """Format the run name from locations with 1st location as prefix."""
     assert locations, "Locations are not specified."
 
     # Location count and hash
     n = len(locations)
-    hsh = f"_{hash_str(''.join(locations), max_len=7)}"
+    hsh = f"_{hash_strs(locations, max_len=7)}"
 
     # Get the run name from the first location and suffix
     run_name = text_to_id(f"{locations[0].replace(':', '-')}_{n}{hsh}")
@@ -228,7 +342,8 @@ def file_ready(f: Path) -> bool:
 def create_zip(file_list: list[Path], zip_name: str):
     """Create a zip archive from a list of files."""
     archive_path = Path(tempfile.mkdtemp()) / zip_name
-    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as zip_archive:
+    # Fastest deflate level, compression time dominates for large result files
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zip_archive:
         for file_path in file_list:
             try:
                 zip_archive.write(str(file_path), arcname=file_path.name)
@@ -238,6 +353,50 @@ def create_zip(file_list: list[Path], zip_name: str):
     return archive_path
 
 
+class ZipStreamBuffer(io.RawIOBase):
+    """Write-only, non-seekable buffer collecting zip archive bytes until they are streamed out."""
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def pop(self) -> bytes:
+        """Return the bytes written since the last call."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(file_list: list[Path], chunk_size: int = 1 << 20):
+    """
+    Stream a zip archive of a list of files, without writing the archive to disk.
+    :param file_list: files to archive
+    :param chunk_size: size of file chunks read at a time
+    :return: generator of zip archive bytes
+    """
+    buf = ZipStreamBuffer()
+    # Fastest deflate level, compression time dominates for large result files
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zip_archive:
+        for file_path in file_list:
+            file_path = Path(file_path)
+            if not file_path.is_file():
+                print(f"Warning: File '{file_path}' not found. Skipping.")
+                continue
+
+            force_zip64 = file_path.stat().st_size >= zipfile.ZIP64_LIMIT
+            with open(file_path, "rb") as src, zip_archive.open(file_path.name, "w", force_zip64=force_zip64) as dst:
+                while chunk := src.read(chunk_size):
+                    dst.write(chunk)
+                    yield buf.pop()
+
+    yield buf.pop()
+
+
 def report_progress(logger, name, items, done_perc, total_count) -> int:
     """Report progress of a task."""
     # Calculate the percentage of done items
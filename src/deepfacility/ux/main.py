@@ -1,16 +1,24 @@
+import asyncio
+import html
+import os
 import shutil
+import threading
 import time
 
 import fastapi
-import warnings
 
 import importlib.metadata
+import multiprocessing
 import pandas as pd
 import uvicorn
 
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import asdict
+from functools import lru_cache
 from fastapi import File, UploadFile, Request, Form, BackgroundTasks
-from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from tempfile import mkdtemp
@@ -20,10 +28,23 @@ from deepfacility.lang import Translator
 from deepfacility.utils import commands, spatial, util
 from deepfacility.viz import visualize
 
-from deepfacility.config.config import Config, AdmPointsFile, BaselineFile, get_all_locations
+from deepfacility.config.config import Config, AdmPointsFile, BaselineFile, Inputs, get_all_locations
 from deepfacility.ux.session import Session, ConfigForm, is_localhost, app, templates
 
-warnings.simplefilter(action='ignore', category=FutureWarning)
+# The installed package version doesn't change while the app is running
+app_version = importlib.metadata.version('deepfacility')
+
+# Workflow instances reused across background tasks, per config instance
+workflow_instances: dict[tuple[type, int], object] = {}
+workflow_instances_lock = threading.Lock()
+workflow_instances_max_size = 8
+
+# Worker processes running the scientific workflow, (re)created on first use
+run_executor: ProcessPoolExecutor = None
+run_executor_lock = threading.Lock()
+
+# Script reloading the page after a delay in milliseconds, to refresh UI content
+reload_page_script = "<script>setTimeout(() => location.reload(), {delay})</script>"
 
 
 # app and  templates are initiated in the session module
@@ -39,7 +60,7 @@ def index(request: Request, language: str = Form(default="")):
     # Get supported languages for the language selector
     all_languages = s.translator.supported_languages
     context = {"request": request,
-               "version": importlib.metadata.version('deepfacility'),
+               "version": app_version,
                "language": s.translator.language,
                "session_id": s.session_id,
                "all_languages": all_languages}
@@ -68,23 +89,14 @@ def driver(request: Request):
     # Check if app is configured and inputs are redy
     if s.has_config_file() and s.cfg.inputs.ready():
         # Get the list of existing runs
-        root_dir = s.cfg.results.root_dir
-        result_dirs = list(root_dir.glob("*"))
         result_names = []
-        if result_dirs and len(result_dirs) > 0:
-            # Filter complete runs
-            result_dirs = sorted(
-                [(d.lstat().st_mtime, d.stem, d.joinpath("locations.csv").read_text())
-                 for d in result_dirs
-                 if d.is_dir()
-                    and d.joinpath("optimal_facilities.csv").is_file()
-                    and d.joinpath("locations.csv").is_file()
-                 ], reverse=True)
-    
-            # Put the latest on top and sort rest by name
-            if len(result_dirs) > 0:
-                result_dirs = [result_dirs[0]] + sorted(result_dirs[1:], key=lambda x: x[1])
-                result_names = [(d, locs) for _, d, locs in result_dirs]
+        # Filter complete runs
+        result_dirs = sorted(get_complete_runs(s.cfg.results.root_dir), reverse=True)
+    
+        # Put the latest on top and sort rest by name
+        if len(result_dirs) > 0:
+            result_dirs = [result_dirs[0]] + sorted(result_dirs[1:], key=lambda x: x[1])
+            result_names = [(d, locs) for _, d, locs in result_dirs]
                 
         context = {
             "request": request,
@@ -119,7 +131,7 @@ def clear_view(request: Request):
         response = templates.TemplateResponse(status_page, context)
     else:
         # Return an empty `view` div to clear the map view element.
-        response = HTMLResponse(content=get_empty_div("view"), status_code=200)
+        response = html_fragment_response(get_empty_div("view"))
 
     return response
 
@@ -127,8 +139,8 @@ def clear_view(request: Request):
 @app.get("/new", response_class=HTMLResponse)
 def new_config(request: Request):
     """Display Yes/No buttons for the New Config button."""
-    # Initialize session to ensure language is set
-    Session.init(request)
+    # Set the session translator to ensure language is set
+    Session.init_translator(request)
     # Pressing `Yes` button sends `oknew` request, otherwise `/info`.
     context = {"request": request}
     return templates.TemplateResponse("12-confirm-new.html", context)
@@ -159,7 +171,7 @@ def info(request: Request):
     if s.has_config_file() and s.cfg.inputs.ready():
         # If ready show the config info at the top
         # Prepare response dict containing key confing info
-        cf_dict = asdict(s.get_config_form())
+        cf_dict = s.get_config_form_dict()
         # Detect if app is running locally
         if is_localhost(request):
             # Add app dir path to the config info to display in UI
@@ -175,9 +187,9 @@ def info(request: Request):
         df, df_b = get_preview_dfs(s.cfg)
         
         context = {"request": request,
-                   "village_preview": df.head().to_html(index=False),
-                   "baseline_preview": df_b.head().to_html(index=False) if df_b is not None else "",
-                   **asdict(s.get_config_form())
+                   "village_preview": df_head_html(df),
+                   "baseline_preview": df_head_html(df_b) if df_b is not None else "",
+                   **s.get_config_form_dict()
                    }
         response = templates.TemplateResponse("30-prep.html", context)
     
@@ -203,10 +215,10 @@ def upload_csv(request: Request,
         tmp_dir = Path(mkdtemp())
         s.village_file = tmp_dir / village_file.filename
         
-        # Load file, get columns and save to session dir
-        df = pd.read_csv(village_file.file, encoding='utf-8')
-        village_cols = sorted(df.columns)
-        df.to_csv(s.village_file, index=False, encoding='utf-8')
+        # Save the file to session dir as is, then read only the header to get columns
+        with open(s.village_file, "wb") as f:
+            shutil.copyfileobj(village_file.file, f)
+        village_cols = sorted(pd.read_csv(s.village_file, encoding='utf-8', nrows=0).columns)
         
         # Check if baseline file is uploaded
         if baseline_file:
@@ -254,9 +266,10 @@ def configure(request: Request,
     """Configure the app with based on uploaded village and baseline files."""
     s = Session.init(request)
     
-    # Read uploaded village file
-    df = pd.read_csv(s.village_file, encoding='utf-8')
-    df = df[[village_lon_col, village_lat_col]]
+    # Read only the coordinates columns of the uploaded village file
+    xy_cols = [village_lon_col, village_lat_col]
+    df = pd.read_csv(s.village_file, encoding='utf-8', usecols=xy_cols, dtype={c: 'float64' for c in xy_cols}, engine='pyarrow')
+    df = df[xy_cols]
     
     # Detect the country from village centers
     country, code = spatial.detect_country(df=df, xy_cols=[village_lon_col, village_lat_col])
@@ -282,8 +295,8 @@ def configure(request: Request,
     
     context = {"request": request,
                "has_data": s.cfg.inputs.ready(),
-               "village_preview": df.head().to_html(index=False),
-               "baseline_preview": df_b.head().to_html(index=False) if df_b is not None else "",
+               "village_preview": df_head_html(df),
+               "baseline_preview": df_head_html(df_b) if df_b is not None else "",
                **asdict(cf)}
     
     return templates.TemplateResponse("30-prep.html", context)
@@ -313,7 +326,7 @@ def prep(request: Request, bt: BackgroundTasks):
 
 
 @app.get("/prep/status/container", response_class=HTMLResponse)
-def prep_status_container(request: Request):
+async def prep_status_container(request: Request):
     """Data preparation workflow status tracking page."""
     context = {"request": request}
     # The template renders the page which periodically sends
@@ -322,84 +335,80 @@ def prep_status_container(request: Request):
 
 
 @app.get("/prep/status", response_class=HTMLResponse)
-def prep_status(request: Request):
-    """Data preparation workflow status page."""
-    s = Session.init(request)
+async def prep_status(request: Request):
+    """
+    Data preparation workflow status page.
+    Polled by every client, so it runs on the event loop and awaits blocking reads.
+    """
+    s = await run_in_threadpool(Session.init, request)
     
     # Check if app is not configured or the data preparation task is stopped
-    if not s.cfg or s.cfg.inputs.is_stopped():
+    if not s.cfg or await run_in_threadpool(s.cfg.inputs.is_stopped):
         # Redirect to driver which will clean up and redirect to upload.
-        time.sleep(5)
+        await asyncio.sleep(5)
         return RedirectResponse(url='/driver')
     
-    # Alias for the Inputs configuration section
+    # Get the status of the data preparation steps
     ins = s.cfg.inputs
-    
-    # Check if all shape files are present
-    shp_x, bld_x, hhs_x, vil_x = (all([f.is_file() for f in ins.shape_files]),
-                                  ins.buildings.file.is_file(),
-                                  ins.households.file.is_file(),
-                                  ins.village_centers.file.is_file())
-
-    shp = bld = hhs = vil = "Not Started"
-    
-    # Calculate the progress of each step
-    if shp_x:
-        # Calculate the size of the shape files
-        size = ins.shape_files[-1].lstat().st_size // 1000000
-        # Set Done if the buildings file (next step) is present.
-        shp = "In Progress" if not bld_x else "Done"
-        # Construct the status string.
-        shp = f"{shp} ({size}MB)"
-    else:
-        shp = "In Progress (...)"
-        
-    if bld_x:
-        size = ins.buildings.file.lstat().st_size // 1000000
-        bld = "In Progress" if not hhs_x else "Done"
-        bld = f"{bld} ({size}MB)"
-    else:
-        bld = "In Progress (...)"
-        
-    if hhs_x:
-        size = ins.households.file.lstat().st_size // 1000000
-        hhs = "In Progress" if not vil_x else "Done"
-        hhs = f"{hhs} ({size}MB)"
-    else:
-        hhs = "In Progress (...)"
-        
-    if vil_x:
-        size = ins.village_centers.file.lstat().st_size // 1000
-        vil2_x = ins.village_centers.file.with_suffix(".geojson").is_file()
-        vil = "In Progress" if not vil2_x else "Done"
-        vil = f"{vil} ({size}kB)"
-        vil_time = time.time() - ins.village_centers.file.lstat().st_mtime
-    else:
-        vil_time = 0
+    status, done = await run_in_threadpool(get_prep_status, ins)
     
     # Check if the data preparation task is complete or stopped
-    if s.cfg.inputs.ready() and (vil_time > 10 or s.cfg.inputs.is_stopped()):
+    if done:
         s.clear_task()
         return reload_page_response()
 
     # If still running get latest logs to display in the UI
-    prep_logs = get_logs(s.cfg.inputs.log_file)
+    prep_logs = await run_in_threadpool(get_logs, ins.log_file)
 
     # Prepare status response
     elapsed = get_elapsed_time(s.start_time)
     
     # Construct the status response
-    context = {"request": request,
-               "shp": shp,
-               "bld": bld,
-               "hhs": hhs,
-               "vil": vil,
-               "elapsed": elapsed,
-               "logs": prep_logs}
+    context = {"request": request, **status, "elapsed": elapsed, "logs": prep_logs}
     
     return templates.TemplateResponse("30-prep-status.html", context)
 
 
+@app.get("/prep/status/stream")
+async def prep_status_stream(request: Request):
+    """
+    Data preparation workflow status stream.
+    Pushes the status page as server-sent events when the status changes, instead of being polled.
+    """
+    s = await run_in_threadpool(Session.init, request)
+    template = templates.get_template("30-prep-status.html")
+
+    async def events():
+        last_state, last_time = None, 0.0
+        while not await request.is_disconnected():
+            # Reload the page if app is not configured, or the task is stopped or complete
+            if not s.cfg or await run_in_threadpool(s.cfg.inputs.is_stopped):
+                yield sse_event(reload_page_script.format(delay=0))
+                break
+
+            status, done = await run_in_threadpool(get_prep_status, s.cfg.inputs)
+            if done:
+                s.clear_task()
+                yield sse_event(reload_page_script.format(delay=7000))
+                break
+
+            # Push the status on changes, and periodically to refresh the elapsed time
+            prep_logs = await run_in_threadpool(get_logs, s.cfg.inputs.log_file)
+            state = (status, prep_logs)
+            if state != last_state or time.time() - last_time >= 5:
+                context = {"request": request, **status, "elapsed": get_elapsed_time(s.start_time), "logs": prep_logs}
+                yield sse_event(template.render(context))
+                last_state, last_time = state, time.time()
+
+            await asyncio.sleep(1)
+
+        # Keep the stream open until the page reloads, the browser reconnects to a closed stream
+        while not await request.is_disconnected():
+            await asyncio.sleep(1)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @app.post("/run", response_class=HTMLResponse)
 def run(request: Request, bt: BackgroundTasks, locs: list[str] = Form(...)):
     """Run the scientific workflow via FastAPI background tasks."""
@@ -419,7 +428,7 @@ def run(request: Request, bt: BackgroundTasks, locs: list[str] = Form(...)):
     
     # Clear previous run and start the new background task
     s.cfg.results.remove_files()
-    s.start_task(s.cfg.results, bt, run_locs, s.cfg, s.translator, s.clear_task)
+    s.start_task(s.cfg.results, bt, run_locs_in_worker, s.cfg, s.translator, s.clear_task)
     
     # Navigate to the page which sends regular status requests and displays the status.
     context = {"request": request, "show_large": "false"}
@@ -428,7 +437,7 @@ def run(request: Request, bt: BackgroundTasks, locs: list[str] = Form(...)):
 
 
 @app.get("/run/status/container", response_class=HTMLResponse)
-def run_status_container(request: Request):
+async def run_status_container(request: Request):
     """Scientific workflow status tracking page."""
     # The template renders the page which periodically sends
     # `/run/status` requests and displays responses in the `status` div.
@@ -437,38 +446,38 @@ def run_status_container(request: Request):
 
 
 @app.get("/run/status", response_class=HTMLResponse)
-def run_status(request: Request):
-    """Scientific workflow status page."""
-    s = Session.init(request)
-    if not s.cfg or not s.cfg.config_file or not s.cfg.config_file.is_file():
+async def run_status(request: Request):
+    """
+    Scientific workflow status page.
+    Polled by every client, so it runs on the event loop and awaits blocking reads.
+    """
+    s = await run_in_threadpool(Session.init, request)
+    if not s.cfg or not s.cfg.config_file or not await run_in_threadpool(s.cfg.config_file.is_file):
         return "Config not found."
            
-    locs_file = s.cfg.results.locations_file
-    assert locs_file.parent != "all", f"Run name not set properly {locs_file}."
+    results = s.cfg.results
+    locs_file = results.locations_file
+    assert locs_file.is_relative_to(results.root_dir), f"Run name not set properly {locs_file}."
     
     # If the locations file is not present reset the config.
-    if not locs_file.is_file():
-        s.cfg.results.logger.warning("The configuration was not successful (no locations file). Redirecting to the upload page.")
+    if not await run_in_threadpool(locs_file.is_file):
+        results.logger.warning("The configuration was not successful (no locations file). Redirecting to the upload page.")
         
         # Refresh and let `info` and `driver` sections handle the rest
         return reload_page_response()
 
     # If the run is stopped, reload the page to display the `run` page.
-    if s.cfg.results.is_stopped():
+    if await run_in_threadpool(results.is_stopped):
         s.clear_task()
         return reload_page_response()
     
     # Check if each location has a facility file.
-    locations = locs_file.read_text().splitlines()
-    file_ptt = s.cfg.results.facilities.file
-    files = [spatial.location_path(file_ptt, loc) for loc in locations]
-    files_ok = [f.is_file() for f in files]
+    files, files_ok = await run_in_threadpool(get_facility_files_status, s.cfg, locs_file)
     
     if all(files_ok):
         # It is done, reload page to refresh the results list.
         s.clear_task()
-        time.sleep(min(len(files_ok), 10))
-        return reload_page_response()
+        return reload_page_response(seconds=7 + min(len(files_ok), 10))
 
     # Not yet done, display status and logs.
     # Construct status to show number of done locations and those still in progress.
@@ -478,7 +487,7 @@ def run_status(request: Request):
             for (f, ok) in zip(files, files_ok) if not ok]
     
     # If still running get latest logs to display in the UI
-    res_logs = get_logs(s.cfg.results.log_file)
+    res_logs = await run_in_threadpool(get_logs, results.log_file)
 
     # Prepare status response
     elapsed = get_elapsed_time(s.start_time)
@@ -494,15 +503,15 @@ def stop_run(request: Request):
     s = Session.init(request)
     s.stop_task()
     # Return a message to display in the UI
-    return HTMLResponse(s.translator.translate("Stopping..."))
+    return html_fragment_response(s.translator.translate("Stopping..."))
 
 
 @app.post("/view", response_class=HTMLResponse)
-def show_results(request: Request,
+async def show_results(request: Request,
                  result_name: str = Form(...),
                  show_large: str = Form(...)):
     """Display the map with the run results"""
-    s = Session.init(request)
+    s = await run_in_threadpool(Session.init, request)
 
     # For running tasks, display status
     if s.has_task:
@@ -512,63 +521,66 @@ def show_results(request: Request,
     
     # If no run name clear the `downloads` section
     if result_name == "None" and show_large == "None":
-        return "<div id='downloads' />"
+        return html_fragment_response("<div id='downloads' />")
     
     run_dir = s.cfg.results.root_dir / result_name
-    dirs = [str(d) for d in list(run_dir.glob("*")) if d.is_dir() and d.name != 'www']
-    for d in dirs:
-        shutil.rmtree(str(d))
-
-    result_files = [str(f.name) for f in get_result_files(run_dir)]
-
-    # Check if the map can be displayed
-    if show_large == "false":
-        # Tool many location can cause the map to be non-responsive
-        # This can be overridden by setting the `show_large` to `true`
-        msg = check_max_locations(s.cfg, run_dir.joinpath("locations.csv"))
-        if msg:
-            return msg
+    # Too many locations can cause the map to be non-responsive
+    # This can be overridden by setting the `show_large` to `true`
+    result_files, msg = await run_in_threadpool(prep_result_dir, s.cfg, run_dir, show_large == "false")
+    if msg:
+        return msg
 
     # Construct the map URL and dir
     result_url = f"/viewmap/{result_name}"
     result_dir = run_dir / 'www'
     
-    n = 0
-    # Wait for the map to be ready
-    while not result_dir.is_dir() and n < 5:
-        time.sleep(1)
-        n += 1
-    
-    # If the map is ready, display it
-    if result_dir.is_dir():
-        # Mount the map directory to the app routes
-        app.mount(result_url, StaticFiles(directory=result_dir), name="static")
+    # If the map is ready, display it, the map files are served by the `/viewmap` route
+    if await wait_for_dir(result_dir, timeout=5):
         context = {'request': request,
                    'result_name': result_name,
                    'result_url': f"{result_url}/index.html",
                    'result_files': result_files}
         return templates.TemplateResponse("50-map.html", context)
     else:
-        return "Map is not ready.<div id='downloads' />"
+        return html_fragment_response("Map is not ready.<div id='downloads' />")
+
+
+@app.get("/viewmap/{result_name}/{path:path}", response_class=FileResponse)
+def view_map_file(request: Request, result_name: str, path: str):
+    """
+    Serve the run results map files.
+    A single route for all runs, instead of mounting each run map dir to the app routes.
+    """
+    s = Session.init(request)
+    root_dir = s.cfg.results.root_dir.resolve()
+    www_dir = (root_dir / result_name / 'www').resolve()
+    file = (www_dir / path).resolve()
+
+    # failsafe check, only serve files from a run map dir
+    if www_dir.parent.parent != root_dir or not file.is_relative_to(www_dir) or not file.is_file():
+        return HTMLResponse(content="Not found.", status_code=404)
+
+    return FileResponse(path=file)
 
 
 @app.post("/remove", response_class=RedirectResponse)
 def remove_results(request: Request, result_name: str = Form(...)):
     """Remove the selected run results."""
     s = Session.init(request)
-    run_dir = s.cfg.results.root_dir / result_name
+    results = s.cfg.results
+    run_dir = results.root_dir / result_name
     # failsafe check
-    if run_dir.is_dir() and run_dir.parent.samefile(s.cfg.results.root_dir):
+    if run_dir.is_dir() and run_dir.parent.samefile(results.root_dir):
         shutil.rmtree(run_dir)
     else:
-        s.cfg.results.logger.warning(f"Directory doesn't appear to be a valid 'run' directory: {run_dir}")
+        results.logger.warning(f"Directory doesn't appear to be a valid 'run' directory: {run_dir}")
     
     # Redirect to the index page to refresh the results list
     # HTTP_302_FOUND is necessary to allow the browser to redirect
     return RedirectResponse('/', status_code=fastapi.status.HTTP_302_FOUND)
     
 
-@app.post("/download", response_class=FileResponse)
+@app.post("/download", response_class=StreamingResponse)
 def download_results(request: Request, result_name: str = Form(...)):
     """Download the selected run results as a zip file."""
     s = Session.init(request)
@@ -580,27 +592,36 @@ def download_results(request: Request, result_name: str = Form(...)):
     # Get result files to be zipped
     res_files = get_result_files(res_dir)
     assert all([result_name in str(f) for f in res_files]), f"{result_name} not present in result file paths."
-    path = util.create_zip(res_files, zip_name=file_name)
     
-    # Return the zip file as a response, will prompt the user to download
-    return FileResponse(path=path, filename=file_name, media_type='application/zip')
+    # Stream the zip archive as it is created, will prompt the user to download
+    headers = {"Content-Disposition": f'attachment; filename="{file_name}"'}
+    return StreamingResponse(util.stream_zip(res_files), media_type='application/zip', headers=headers)
 
 
 # Workflow helpers
 
-def get_preview_dfs(cfg: Config) -> tuple[pd.DataFrame, pd.DataFrame]:
+def df_head_html(df: pd.DataFrame, n: int = 5) -> str:
+    """Render the first rows of a DataFrame as an HTML table, without the pandas HTML formatter."""
+    head = "".join(f"<th>{html.escape(str(c))}</th>" for c in df.columns)
+    rows = "".join("<tr>" + "".join(f"<td>{html.escape(str(v))}</td>" for v in row) + "</tr>"
+                   for row in df.head(n).itertuples(index=False, name=None))
+    return f'<table border="1" class="dataframe"><thead><tr>{head}</tr></thead><tbody>{rows}</tbody></table>'
+
+
+def get_preview_dfs(cfg: Config, n: int = 5) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Read the first `n` rows of the uploaded files, parsing only the previewed columns."""
     # Read uploaded village file
     vc: AdmPointsFile = cfg.args.village_centers
     bs: BaselineFile = cfg.args.baseline_facilities
     
-    df0 = pd.read_csv(vc.file, encoding='utf-8')
-    df = df0[[vc.adm_cols[-1], *vc.xy_cols]]
+    cols = [vc.adm_cols[-1], *vc.xy_cols]
+    df = pd.read_csv(vc.file, encoding='utf-8', usecols=cols, nrows=n)[cols]
     
     if bs.file and bs.file.is_file():
         # Read uploaded baseline file, if available
-        df_b0 = pd.read_csv(bs.file, encoding='utf-8')
-        df_b0 = df_b0.reset_index()
-        df_b = df_b0[['index', *bs.xy_cols, *bs.info_cols]]
+        cols = [*bs.xy_cols, *bs.info_cols]
+        df_b0 = pd.read_csv(bs.file, encoding='utf-8', usecols=cols, nrows=n)[cols]
+        df_b = df_b0.reset_index()
     else:
         df_b = None
     
@@ -612,7 +633,7 @@ def get_preview_dfs(cfg: Config) -> tuple[pd.DataFrame, pd.DataFrame]:
 
 def prep_data(cfg: Config, translator: Translator, clean_fn):
     """Background task function for preparing data for the selected country."""
-    t = DataPrepWorkflow(cfg=cfg).prepare_inputs(cfg.args.country)
+    t = get_workflow_instance(DataPrepWorkflow, cfg).prepare_inputs(cfg.args.country)
     if t[-1]:
         time.sleep(3)
         cfg.inputs.logger.info("Completed data preparation!")
@@ -622,27 +643,123 @@ def prep_data(cfg: Config, translator: Translator, clean_fn):
     clean_fn()
     
 
-def run_locs(cfg: Config, translator: Translator, clean_fn):
+def run_locs(cfg: Config, translator: Translator, clean_fn=None, reuse_instances: bool = True):
     """Background task function for running the scientific workflow."""
     done = commands.cmd_run(cfg=cfg, cli=False)
     if done and not cfg.results.is_stopped() and cfg.results.ready():
         # Create the interactive map for the run results.
-        visualize.Visualizer(cfg=cfg).create_leaflet_map(
-            result_dir=cfg.results.dir,
-            translator=translator)
+        visualizer = get_workflow_instance(visualize.Visualizer, cfg) if reuse_instances else visualize.Visualizer(cfg)
+        visualizer.create_leaflet_map(result_dir=cfg.results.dir, translator=translator)
+    if clean_fn:
+        clean_fn()
+
+
+def run_locs_process(cfg: Config, language: str):
+    """
+    Worker process function for running the scientific workflow.
+    Loggers and the translator don't survive pickling, so they are rebuilt in the worker.
+    """
+    cfg.inputs.logger = None
+    cfg.results.logger = None
+    run_locs(cfg, Translator.create(language=language), reuse_instances=False)
+
+
+async def run_locs_in_worker(cfg: Config, translator: Translator, clean_fn):
+    """
+    Background task function running the scientific workflow in a worker process on Linux,
+    so the CPU heavy workflow doesn't contend with request handling in the app process.
+    """
+    if util.is_linux():
+        executor = get_run_executor()
+        try:
+            await asyncio.get_running_loop().run_in_executor(executor, run_locs_process, cfg, translator.language)
+        except BrokenProcessPool as ex:
+            # The worker was killed, e.g. out of memory, replace the pool for the next runs
+            cfg.results.logger.error(f"The run worker process exited unexpectedly: {ex}")
+            reset_run_executor(executor)
+        except Exception as ex:
+            cfg.results.logger.error(f"The run failed: {ex}")
+    else:
+        await run_in_threadpool(run_locs, cfg, translator)
+
     clean_fn()
 
 
 # Helper functions
 
 
+def get_workflow_instance(cls: type, cfg: Config):
+    """
+    Get a workflow (or workflow entity) instance for the config, reused across background tasks.
+    :param cls: workflow class, constructed with the config
+    :param cfg: config instance
+    :return: workflow instance
+    """
+    # Instances keep a reference to their config, so its id can't be reused while cached
+    key = (cls, id(cfg))
+    with workflow_instances_lock:
+        instance = workflow_instances.get(key)
+        if instance is None or instance.cfg is not cfg:
+            instance = cls(cfg=cfg)
+            workflow_instances[key] = instance
+            # Evict the oldest instances
+            while len(workflow_instances) > workflow_instances_max_size:
+                workflow_instances.pop(next(iter(workflow_instances)))
+
+    return instance
+
+
+def get_run_executor() -> ProcessPoolExecutor:
+    """
+    Get the worker processes pool for the scientific workflow.
+    Workers are spawned, so they don't inherit locks held by the app threads.
+    :return: process pool executor
+    """
+    global run_executor
+    with run_executor_lock:
+        if run_executor is None:
+            run_executor = ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                               mp_context=multiprocessing.get_context("spawn"))
+        return run_executor
+
+
+def reset_run_executor(executor: ProcessPoolExecutor):
+    """
+    Discard a broken worker processes pool, a new one is created on next use.
+    :param executor: broken process pool executor
+    """
+    global run_executor
+    with run_executor_lock:
+        if run_executor is executor:
+            run_executor = None
+    executor.shutdown(wait=False)
+
+
+def prep_result_dir(cfg: Config, run_dir: Path, check_locations: bool) -> tuple[list[str], str]:
+    """
+    Remove the per-location result dirs and list the result files of a run.
+    :param cfg: config instance
+    :param run_dir: run result directory
+    :param check_locations: check the number of locations can be displayed on the map
+    :return: result file names, and a message if the map can't be displayed
+    """
+    for d in run_dir.glob("*"):
+        if d.is_dir() and d.name != 'www':
+            shutil.rmtree(d)
+
+    result_files = [str(f.name) for f in get_result_files(run_dir)]
+    msg = check_max_locations(cfg, run_dir.joinpath("locations.csv")) if check_locations else ""
+    return result_files, msg
+
+
 def check_max_locations(cfg: Config, loc_file: Path):
     """
     Prevent non--responsive map visualization if
     the number of locations is too large.
     """
     if loc_file.is_file():
-        loc_count = len(list(loc_file.read_text().split('\n')))
+        # Same count as splitting the file text by line breaks
+        loc_count = util.count_newlines(loc_file) + 1
     else:
         loc_count = 0
 
@@ -657,10 +774,96 @@ def check_max_locations(cfg: Config, loc_file: Path):
     return msg
 
 
+def get_prep_status(ins: Inputs) -> tuple[dict, bool]:
+    """
+    Get the data preparation steps status.
+    :param ins: Inputs configuration section
+    :return: status of each step (shp, bld, hhs, vil), and whether the data preparation is complete
+    """
+    # Check if all shape files are present
+    shp_x, bld_x, hhs_x, vil_x = (all([f.is_file() for f in ins.shape_files]),
+                                  ins.buildings.file.is_file(),
+                                  ins.households.file.is_file(),
+                                  ins.village_centers.file.is_file())
+
+    shp = bld = hhs = vil = "Not Started"
+    
+    # Calculate the progress of each step
+    if shp_x:
+        # Calculate the size of the shape files
+        size = ins.shape_files[-1].lstat().st_size // 1000000
+        # Set Done if the buildings file (next step) is present.
+        shp = "In Progress" if not bld_x else "Done"
+        # Construct the status string.
+        shp = f"{shp} ({size}MB)"
+    else:
+        shp = "In Progress (...)"
+        
+    if bld_x:
+        size = ins.buildings.file.lstat().st_size // 1000000
+        bld = "In Progress" if not hhs_x else "Done"
+        bld = f"{bld} ({size}MB)"
+    else:
+        bld = "In Progress (...)"
+        
+    if hhs_x:
+        size = ins.households.file.lstat().st_size // 1000000
+        hhs = "In Progress" if not vil_x else "Done"
+        hhs = f"{hhs} ({size}MB)"
+    else:
+        hhs = "In Progress (...)"
+        
+    if vil_x:
+        size = ins.village_centers.file.lstat().st_size // 1000
+        vil2_x = ins.village_centers.file.with_suffix(".geojson").is_file()
+        vil = "In Progress" if not vil2_x else "Done"
+        vil = f"{vil} ({size}kB)"
+        vil_time = time.time() - ins.village_centers.file.lstat().st_mtime
+    else:
+        vil_time = 0
+    
+    done = ins.ready() and (vil_time > 10 or ins.is_stopped())
+    return {"shp": shp, "bld": bld, "hhs": hhs, "vil": vil}, done
+
+
+def get_complete_runs(root_dir: Path) -> list[tuple[float, str, str]]:
+    """
+    Get the complete runs in the results root dir, scanning dir entries to reuse their cached stat results.
+    :param root_dir: results root directory
+    :return: list of (modification time, run name, locations) of complete runs
+    """
+    if not root_dir.is_dir():
+        return []
+
+    runs = []
+    with os.scandir(root_dir) as entries:
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            try:
+                # A run is complete if it has the optimal facilities and the locations files
+                os.stat(os.path.join(entry.path, "optimal_facilities.csv"))
+                locations = Path(entry.path, "locations.csv").read_text()
+            except FileNotFoundError:
+                continue
+            runs.append((entry.stat(follow_symlinks=False).st_mtime, Path(entry.name).stem, locations))
+
+    return runs
+
+
+def get_facility_files_status(cfg: Config, locs_file: Path) -> tuple[list[Path], list[bool]]:
+    """Get the facility files of the run locations and whether each file exists."""
+    locations = locs_file.read_text().splitlines()
+    file_ptt = cfg.results.facilities.file
+    files = [spatial.location_data_path(file_ptt, loc) for loc in locations]
+    files_ok = [f.is_file() for f in files]
+    return files, files_ok
+
+
 def get_logs(log_file):
     """Get the last 30 lines of the log file."""
     if log_file.is_file():
-        logs = log_file.read_text().splitlines()[-30:]
+        logs = util.tail_lines(log_file, n=30)
     else:
         logs = ""
 
@@ -675,13 +878,27 @@ def get_elapsed_time(start_time):
 
 
 def get_result_files(res_dir: Path) -> list[Path]:
-    """Get the list of files in the result directory."""
-    files = list(res_dir.glob("*.csv"))
-    files += list(res_dir.glob("*.geojson"))
-    files += list(res_dir.glob("*.png"))
-    files += list(res_dir.glob("*.log"))
+    """Get the list of files in the result directory, grouped by file type."""
+    exts = [".csv", ".geojson", ".png", ".log"]
+    if not res_dir.is_dir():
+        return []
 
-    return files
+    # Read the directory once, then group the files by extension
+    with os.scandir(res_dir) as entries:
+        files = [Path(e.path) for e in entries if e.is_file() and os.path.splitext(e.name)[1] in exts]
+
+    return sorted(files, key=lambda f: exts.index(f.suffix))
+
+
+@lru_cache(maxsize=64)
+def html_fragment_body(content: str) -> bytes:
+    """Get the encoded body of a fixed HTML fragment, encoded once per content (e.g. per language)."""
+    return content.encode("utf-8")
+
+
+def html_fragment_response(content: str) -> HTMLResponse:
+    """Get a new response for a fixed HTML fragment, responses are per request as middleware can change them."""
+    return HTMLResponse(content=html_fragment_body(content))
 
 
 def get_empty_div(id):
@@ -690,13 +907,28 @@ def get_empty_div(id):
 
 
 def reload_page_response(seconds=7):
-    """Reload the page after a delay."""
-    time.sleep(seconds)
-    return HTMLResponse("<script>location.reload()</script>")
+    """Reload the page after a delay. The browser waits, so no server thread or task is held."""
+    return HTMLResponse(reload_page_script.format(delay=seconds * 1000))
+
+
+async def wait_for_dir(d: Path, timeout: float = 5) -> bool:
+    """Wait for a directory to be created, without blocking the event loop."""
+    end = time.monotonic() + timeout
+    while not await run_in_threadpool(d.is_dir):
+        if time.monotonic() >= end:
+            return False
+        await asyncio.sleep(0.1)
+
+    return True
+
+
+def sse_event(data: str) -> str:
+    """Format data as a server-sent event message."""
+    lines = "".join(f"data: {line}\n" for line in data.splitlines())
+    return f"{lines}\n"
 
 
 def main():
-    import os
     host = os.environ.get('DEEPFACILITY_HOST', "localhost")
     port = int(os.environ.get('DEEPFACILITY_PORT', "8000"))
     uvicorn.run(app, host=host, port=port)
@@ -1,29 +1,66 @@
 import os
 import shutil
+import threading
 
 import time
 import tomli
 import tomli_w
 
+from collections import OrderedDict
 from pathlib import Path
 from fastapi import Request, BackgroundTasks
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, field
 
 from deepfacility import lang
-from deepfacility.config.config import Config, Inputs, Operation, Results, create_config_file, read_s2_dict
+from deepfacility.config.config import Config, Inputs, Operation, Results, create_config_file, get_country_code
 from deepfacility.utils import util
 
+try:
+    # Native TOML codec, for faster config file round-trips, if installed (`fast` extra)
+    import rtoml
+except ImportError:
+    rtoml = None
+
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.templating import Jinja2Templates
 
+
+class GZipExceptStreamsMiddleware(GZipMiddleware):
+    """GZip middleware, skipping server-sent event streams (must not be buffered) and already compressed files."""
+    excluded_paths = ["/prep/status/stream", "/download"]
+    excluded_suffixes = (".png", ".jpg", ".jpeg", ".gif", ".zip", ".gz", ".parquet")
+
+    async def __call__(self, scope, receive, send):
+        path = scope["path"] if scope["type"] == "http" else ""
+        if path in self.excluded_paths or path.lower().endswith(self.excluded_suffixes):
+            await self.app(scope, receive, send)
+        else:
+            await super().__call__(scope, receive, send)
+
+
 # initiate app here to use app.state to preserve session
 app = FastAPI()
+# compress text-heavy responses, like the regularly polled status pages
+app.add_middleware(GZipExceptStreamsMiddleware, minimum_size=512)
 
 # initiate templates here to set `_` translation function in the session init
 templates = Jinja2Templates(directory=Path(__file__).parent / "templates")
 
+# Templates don't change at runtime, so skip per-request template file checks unless reloading is enabled,
+# and compile all templates once at startup instead of on first request.
+templates.env.auto_reload = os.environ.get('DEEPFACILITY_TEMPLATES_RELOAD', "") == "1"
+for template_name in templates.env.list_templates():
+    templates.env.get_template(template_name)
+
+# session id set for the CLI scenario, read once as it's set before the app starts
+env_session_id = os.environ.get('DEEPFACILITY_SID', None)
 
-@dataclass
+# session config files are named after the default config file, like 'config.<village file stem>.toml'
+default_config_stem = Path(Config.default_file).stem
+
+
+@dataclass(slots=True)
 class ConfigForm:
     """Config file form data."""
     # Country
@@ -38,10 +75,10 @@ class ConfigForm:
     baseline_file: str = ""
     baseline_lon_col: str = ""
     baseline_lat_col: str = ""
-    baseline_info_cols: list[str] = None
+    baseline_info_cols: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Session:
     """Session data."""
     session_id: str = None
@@ -49,9 +86,11 @@ class Session:
     village_file: Path = ""
     baseline_file: Path = ""
     cfg: Config = None
-    start_time: float = time.time()
+    start_time: float = field(default_factory=time.time)
     translator: lang.Translator = None
     _operation: Operation = None
+    _config_form_dict: dict = None
+    _task_done: threading.Event = field(default_factory=threading.Event)  # set when the task is cleared
     
     @property
     def data_dir(self):
@@ -61,7 +100,7 @@ class Session:
     @classmethod
     def get_session_id(cls, request: Request) -> str:
         """Get the session id from one of the possible sources"""
-        session_id = os.environ.get('DEEPFACILITY_SID', None)         # from env variable
+        session_id = env_session_id                                   # from env variable
         session_id = session_id or request.query_params.get("sid")    # from query string
         session_id = session_id or request.cookies.get("session_id")  # from cookie
         session_id = session_id or util.new_session_id(length=12)     # generate a new one
@@ -79,9 +118,9 @@ class Session:
         global app
         assert isinstance(app, FastAPI), "FastAPI app is not initialized"
                 
-        has_s_dict = app and hasattr(app.state, 'session') and isinstance(app.state.session, dict)
+        has_s_dict = app and hasattr(app.state, 'session') and isinstance(app.state.session, SessionStore)
         if not has_s_dict:
-            app.state.session = {}
+            app.state.session = SessionStore()
 
         # Get session id
         session_id = cls.get_session_id(request)
@@ -103,11 +142,9 @@ class Session:
                 pass
         else:
             # For a new session
-            config_file = None
-            for file in Session.get_session_dir(session_id).glob("*.toml"):
-                if not config_file or file.stat().st_ctime > config_file.stat().st_ctime:
-                    # Take the latest config toml file
-                    config_file = file
+            # Take the latest config toml file
+            config_files = Session.get_session_dir(session_id).glob("*.toml")
+            config_file = max(config_files, key=lambda f: f.stat().st_ctime, default=None)
                 
             # Create a config instance (using the latest config file, if exists)
             cfg = Config.create_instance(config_file=config_file) if config_file else None
@@ -125,19 +162,32 @@ class Session:
 
         return s
 
+    @classmethod
+    def init_translator(cls, request: Request):
+        """
+        Set the session translator for templates, for endpoints not using other session state.
+        Existing sessions are only looked up, the session is fully initialized only if not found.
+        """
+        sessions = getattr(app.state, 'session', None)
+        session_id = cls.get_session_id(request)
+        s: Session = sessions.get(session_id, None) if isinstance(sessions, dict) else None
+        if s is None or s.translator is None:
+            cls.init(request)
+        else:
+            templates.env.globals['_'] = s.translator.translate
+
     def init_cfg(self, cf: ConfigForm):
         """Initialize the config from the config form."""
         # Create the config file
         stem: str = Path(cf.village_file).stem
-        config_file = self.session_dir / Path(Config.default_file).with_suffix(f".{stem}.toml").name
+        config_file = self.session_dir / f"{default_config_stem}.{stem}.toml"
         create_config_file(config_file, force=True)
         
         # Read default config from the file
-        content = config_file.read_text()
-        cfg_dict = tomli.loads(content)
+        cfg_dict = load_toml(config_file)
         
         # Get the country code
-        country_code: str = str(read_s2_dict()[cf.country]["code"])
+        country_code: str = get_country_code(cf.country)
         
         # Get the village file pattenr and populate it
         ptt = cfg_dict['args']['village_centers']['file']
@@ -150,11 +200,15 @@ class Session:
             """Move uploaded files from tempt to args dir"""
             file2 = args_dir / Path(file).name
             file2.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(file, file2)
+            try:
+                os.replace(file, file2)  # no data copy if on the same file system
+            except OSError:
+                shutil.copy2(file, file2)
             return str(file2)
 
-        # Move the village file
+        # Move the village file, the session keeps track of the moved file for reconfiguration
         cf.village_file = to_args_dir(cf.village_file)
+        self.village_file = Path(cf.village_file)
         
         # Update config with values from the form
         cfg_dict['args']['data_dir'] = cfg_data_dir
@@ -167,6 +221,7 @@ class Session:
 
         if Path(cf.baseline_file).is_file():
             cf.baseline_file = to_args_dir(cf.baseline_file)
+            self.baseline_file = Path(cf.baseline_file)
             cfg_dict['args']['baseline_facilities']['file'] = cf.baseline_file
             cfg_dict['args']['baseline_facilities']['xy_cols'] = [cf.baseline_lon_col, cf.baseline_lat_col]
             cfg_dict['args']['baseline_facilities']['info_cols'] = cf.baseline_info_cols
@@ -174,27 +229,35 @@ class Session:
             cfg_dict['args']['baseline_facilities']['file'] = ""
         
         # Write the updated config to the file
-        content = tomli_w.dumps(cfg_dict)
-        config_file.write_text(content)
+        dump_toml(cfg_dict, config_file)
         
         # Create a new config instance
         self.cfg: Config = Config.create_instance(config_file=config_file)
+        self._config_form_dict = None
 
     def get_config_form(self):
         """Get the config form for the current config file."""
+        args = self.cfg.args
+        vc, bf = args.village_centers, args.baseline_facilities
         # Prepare response dict containing key confing info to be displayed in the driver
-        return ConfigForm(country=self.cfg.args.country,
-                          country_code=self.cfg.args.country_code,
+        return ConfigForm(country=args.country,
+                          country_code=args.country_code,
                           # village centers
-                          village_file=self.cfg.args.village_centers.file.name,
-                          village_name_col=self.cfg.args.village_centers.adm_cols[-1],
-                          village_lon_col=self.cfg.args.village_centers.xy_cols[0],
-                          village_lat_col=self.cfg.args.village_centers.xy_cols[1],
+                          village_file=vc.file.name,
+                          village_name_col=vc.adm_cols[-1],
+                          village_lon_col=vc.xy_cols[0],
+                          village_lat_col=vc.xy_cols[1],
                           # baseline facilities
-                          baseline_file=self.cfg.args.baseline_facilities.file.name,
-                          baseline_lon_col=self.cfg.args.baseline_facilities.xy_cols[0],
-                          baseline_lat_col=self.cfg.args.baseline_facilities.xy_cols[1],
-                          baseline_info_cols=self.cfg.args.baseline_facilities.info_cols)
+                          baseline_file=bf.file.name,
+                          baseline_lon_col=bf.xy_cols[0],
+                          baseline_lat_col=bf.xy_cols[1],
+                          baseline_info_cols=bf.info_cols)
+
+    def get_config_form_dict(self) -> dict:
+        """Get the config form for the current config file as a dict, cached until the config changes."""
+        if self._config_form_dict is None:
+            self._config_form_dict = asdict(self.get_config_form())
+        return dict(self._config_form_dict)
 
     @property
     def has_task(self) -> bool:
@@ -219,12 +282,15 @@ class Session:
         :param task_fn: Task function to run
         """
         # Clear the previous task if it exists
-        if self._operation and self._operation.is_stopped():
-            time.sleep(5)
-            self._operation.clear()
+        prev_op = self._operation
+        if prev_op and prev_op.is_stopped():
+            # Wait for the stopped task to finish and clear itself, at most 5 seconds
+            self._task_done.wait(timeout=5)
+            prev_op.clear()
             self._operation = None
         
         # Start the new task
+        self._task_done.clear()
         background_tasks.add_task(task_fn, *args, **kwargs)
         self._operation = op
     
@@ -232,6 +298,7 @@ class Session:
         """Clear the current task."""
         if self._operation:
             self._operation = None
+        self._task_done.set()
     
     def stop_task(self):
         """Create the stop file to signal the background task to stop."""
@@ -246,7 +313,71 @@ class Session:
         return self.cfg and self.cfg.config_file and self.cfg.config_file.is_file()
 
 
+class SessionStore(OrderedDict):
+    """
+    Bounded in-memory session store. Least recently used sessions are evicted when the store is full,
+    and sessions idle for longer than `ttl` seconds are evicted on access. Sessions with a running task are kept.
+    Evicted sessions are recreated from the latest config file in the session directory on the next request.
+    """
+    def __init__(self, max_size: int = 10_000, ttl: float = 3600):
+        super().__init__()
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self._last_access: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get a session and mark it as recently used."""
+        with self._lock:
+            self._evict()
+            if key not in self:
+                return default
+            self.move_to_end(key)
+            self._last_access[key] = time.monotonic()
+            return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            self._last_access[key] = time.monotonic()
+            self._evict()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._last_access.pop(key, None)
+
+    def _evict(self):
+        """Evict idle sessions and, if the store is full, the least recently used ones."""
+        expiry = time.monotonic() - self.ttl
+        stale = []
+        for key, session in self.items():
+            if len(self) - len(stale) <= self.max_size and self._last_access.get(key, 0) >= expiry:
+                break  # ordered by access time, the remaining sessions are more recent
+            if not session.has_task:
+                stale.append(key)
+        for key in stale:
+            del self[key]
+
+
+def load_toml(file: Path) -> dict:
+    """Read a TOML file, using the native codec if available."""
+    if rtoml:
+        return rtoml.load(file)
+    return tomli.loads(file.read_text())
+
+
+def dump_toml(data: dict, file: Path):
+    """Write a TOML file, using the native codec if available."""
+    if rtoml:
+        rtoml.dump(data, file)
+    else:
+        file.write_text(tomli_w.dumps(data))
+
+
+local_hosts = ("localhost", "127.0.0.1", "0.0.0.0")
+
+
 def is_localhost(request):
     """Check if the request is from localhost."""
-    hosts = ["localhost", "127.0.0.1", "0.0.0.0"]
-    return any([request.headers.get("host").startswith(v) for v in hosts])
+    return (request.headers.get("host") or "").startswith(local_hosts)
@@ -1,25 +1,32 @@
+import fnmatch
 import matplotlib
-import tempfile
 import os
 from pathlib import Path
 import shutil
 import re
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 matplotlib.use('agg')
 import warnings
 
-warnings.simplefilter(action='ignore', category=FutureWarning)
+warnings.filterwarnings(action='ignore', category=FutureWarning, module=__name__)
 
 from deepfacility.config.config import Config, WorkflowEntity
 from deepfacility.lang import Translator
 from deepfacility.utils import spatial
 
+# template tags containing text to translate, like {{ _("text") }}
+template_tag_pattern = re.compile(r'\{\{\s*_\("([^"]+)"\)\s*\}\}')
+
 
 class Visualizer(WorkflowEntity):
     """Visualizing household clustering, village shapes and optimal placements."""
     def __init__(self, cfg: Config):
         super().__init__(cfg)
         self.logger = self.cfg.results.logger
+        self._archive_dirs: set[Path] = set()  # map archive dirs known to exist
     
     def create_js_file(self, file_path: Path, outfile_path: Path, varname: str, delete_infile: bool = False) -> None:
         """
@@ -29,19 +36,15 @@ class Visualizer(WorkflowEntity):
         :param varname: The variable name.
         :param delete_infile: Whether to delete the input file.
         """
-        prefix = f'var {varname}= '
+        prefix = f'var {varname}= '.encode('utf-8')
         # get only first line
         outfile = file_path.with_suffix('.js') if outfile_path is None else outfile_path
         logger = self.cfg.results.logger
         try:
-            f = open(file_path, 'r', encoding='utf-8')
-            first_line = f.readline()
-            modified_contents = prefix + first_line
-            of = open(outfile, "w")
-            of.write(modified_contents)
-            shutil.copyfileobj(f, of)
-            f.close()
-            of.close()
+            with open(file_path, 'rb') as f, open(outfile, 'wb') as of:
+                first_line = f.readline()
+                of.write(prefix + first_line)
+                copy_file_rest(f, of)
             logger.info(f"JavaScript file created successfully: {outfile}.")
             if delete_infile:
                 file_path.unlink(missing_ok=True)
@@ -62,13 +65,10 @@ class Visualizer(WorkflowEntity):
         """
         cfg = self.cfg
         www_dir = result_dir / "www"
+        # build in a sibling dir and publish it once complete, an existing map folder reads as a ready map
+        build_dir = result_dir / "www.tmp"
+        shutil.rmtree(build_dir, ignore_errors=True)  # left over from an interrupted build
         try:
-            if www_dir.exists():  # if previous viz exists archive it
-                from datetime import datetime
-                to_dir = www_dir.parent / 'www-archive' / datetime.now().strftime("%Y%m%d-%H%M%S")
-                to_dir.parent.mkdir(exist_ok=True, parents=True)
-                www_dir.rename(str(to_dir))
-            
             # read lon/lat, shapes_file from config
             lon_col, lat_col = cfg.results.facilities.xy_cols
             shapes_file = cfg.inputs.shapes.file.with_suffix('.geojson')
@@ -82,66 +82,73 @@ class Visualizer(WorkflowEntity):
             results_shapes = use_abs_path(root_path, (result_dir / cfg.results.shapes.file.name).with_suffix('.geojson'))
             result_facilities = use_abs_path(root_path, result_dir / cfg.results.facilities.file.name)
     
-            # copy the leaflet template to the temporary directory
+            # copy the leaflet template to the map directory
             template_dir = Path(__file__).parent.joinpath("leaflet_template")
             assert template_dir.is_dir(), f'{template_dir} is not a valid directory'
-            with tempfile.TemporaryDirectory() as temp_dir:
-                web_dir = Path(temp_dir) / "www"
-                data_dir = web_dir / "data"
-                if template_dir.is_dir() and 'index.html' in [f.name for f in template_dir.iterdir()]:
-                    shutil.copytree(template_dir, web_dir)
-                else:
-                    raise FileNotFoundError(f'{template_dir} is not valid')
+            web_dir = build_dir
+            data_dir = web_dir / "data"
+            if template_dir.is_dir() and 'index.html' in [f.name for f in template_dir.iterdir()]:
+                shutil.copytree(template_dir, web_dir, dirs_exist_ok=True)
+            else:
+                raise FileNotFoundError(f'{template_dir} is not valid')
     
-                # create map layers, must match those listed in 'leaflet_template/main.js'
-                
-                Path(data_dir).mkdir(parents=True, exist_ok=True)
+            # create map layers, must match those listed in 'leaflet_template/main.js'
+            
+            Path(data_dir).mkdir(parents=True, exist_ok=True)
     
-                # create adm3, village and village centers layers
-                in_shp, in_vil = "gadm", "village_centers"
-                res_shp, res_fac = "village_shapes", "optimal_facilities"
-                self.create_js_file(input_shape, (data_dir / in_shp).with_suffix('.js'), in_shp)
-                self.create_js_file(results_shapes, (data_dir / res_shp).with_suffix('.js'), res_shp)
-                self.create_js_file(input_village_centers, (data_dir / in_vil).with_suffix('.js'), in_vil)
-                
-                # create facilities layer
+            in_shp, in_vil, in_bas = "gadm", "village_centers", "baseline_facilities"
+            res_shp, res_fac = "village_shapes", "optimal_facilities"
+
+            def create_facilities_layer():
+                """Convert the facilities to GeoJson, the input of the facilities JavaScript layer."""
                 self.logger.info(f"Creating facilities GeoJson layer for: {result_facilities.name}")
                 facilities_geojson = spatial.create_geojson(result_facilities, res_fac, data_dir, lon_col, lat_col)
-                self.create_js_file(facilities_geojson, (data_dir / res_fac).with_suffix('.js'), res_fac)
-    
-                # create baseline facilities layer
-                in_bas = "baseline_facilities"
-                outfile_path = (data_dir / in_bas).with_suffix('.js')
-                if cfg.inputs.has_baseline():
-                    bs_file = cfg.inputs.baseline_facilities.file.with_suffix('.geojson')
-                    self.create_js_file(bs_file, outfile_path, in_bas)
-                else:  # empty if the baseline file is not provided
-                    outfile_path.write_text("")
-                    
-                shutil.copytree(web_dir, result_dir / "www")
-    
-                # translate main.js and index.html
-                target_dir = result_dir / "www"
-                target_files = []
-                for path in target_dir.rglob('*'):
-                    if path.is_file() and (path.name == 'index.html' or path.name == 'main.js'):
-                        target_files.append(path)
-                for target_file in target_files:
-                    with open(target_file, 'r', encoding='utf-8') as file:
-                        html_content = file.read()
-                    # Translate the text within the template tags
-                    translated_content = translate_html_template(translator, html_content)
-                    # Overwrite the original HTML file with the translated content
-                    with open(target_file, 'w', encoding='utf-8') as file:
-                        file.write(translated_content)
-    
+                self.create_js_file(facilities_geojson, data_dir / f"{res_fac}.js", res_fac)
+
+            # create adm3, village, village centers and baseline facilities layers
+            layers = [(input_shape, in_shp),
+                      (results_shapes, res_shp),
+                      (input_village_centers, in_vil)]
+            if cfg.inputs.has_baseline():
+                layers.append((cfg.inputs.baseline_facilities.file.with_suffix('.geojson'), in_bas))
+            else:  # empty if the baseline file is not provided
+                (data_dir / f"{in_bas}.js").write_text("")
+
+            # layer files and the facilities conversion are independent file I/O, run them concurrently
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(create_facilities_layer)]
+                futures += [executor.submit(self.create_js_file, file, data_dir / f"{name}.js", name)
+                            for file, name in layers]
+                for future in futures:
+                    future.result()
+
+            # translate main.js and index.html, in sequence as the translator is not thread-safe
+            target_files = [f for f in web_dir.rglob('*') if f.name in ('index.html', 'main.js') and f.is_file()]
+            translations = {}  # shared by the templates, so their common texts are translated once
+            for target_file in target_files:
+                content = target_file.read_text(encoding='utf-8')
+                target_file.write_text(translate_html_template(translator, content, translations), encoding='utf-8')
+
+            # prepare viz file for map display, creating the images dir
+            images_dir = web_dir / 'images'
+            self.copy_viz_files(result_dir, images_dir, "*.png", "www")
+        except Exception:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+
+        try:
+            if www_dir.exists():  # if previous viz exists archive it
+                from datetime import datetime
+                to_dir = www_dir.parent / 'www-archive' / datetime.now().strftime("%Y%m%d-%H%M%S")
+                if to_dir.parent not in self._archive_dirs:
+                    to_dir.parent.mkdir(exist_ok=True, parents=True)
+                    self._archive_dirs.add(to_dir.parent)
+                www_dir.rename(str(to_dir))
+            os.replace(build_dir, www_dir)
         except PermissionError:
             self.logger.info("Map folder already exists.")
-        
-        images_dir = www_dir / 'images'
-        images_dir.mkdir(parents=True, exist_ok=True)
-        # prepare viz file for map display
-        self.copy_viz_files(result_dir, images_dir, "*.png", "www")
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)  # only if it wasn't published
         return Path(result_dir, "www")
         
     def copy_viz_files(self, results_dir: Path, images_dir: Path, filename_pattern: str, exclude_folder_pattern: str):
@@ -157,23 +164,52 @@ class Visualizer(WorkflowEntity):
         if not images_dir.exists():
             images_dir.mkdir(parents=True, exist_ok=True)
     
-        for file in results_dir.rglob(pattern=filename_pattern):
-            try:
-                child_path = Path(file.parent).resolve()
-                parent_path = Path(results_dir).resolve()
-                relative_path = child_path.relative_to(parent_path)
-                if not exclude_folder_pattern in str(relative_path):
-                    target_dir = str(relative_path).replace(os.sep, "_")
-                    new_filename = f"{target_dir}_{file.name}" if target_dir else file
-                    shutil.copy(file, images_dir / new_filename)
-                    self.logger.info(f"Copying viz files: {new_filename} -> {images_dir}")
-            except ValueError as e:
-                self.logger.er(f"Skip copying viz files : {e}")
+        parent_path = Path(results_dir).resolve()
+        for root, dirs, files in os.walk(parent_path):
+            # skip excluded folders (like the map 'www' and 'www-archive') without descending into them
+            dirs[:] = [d for d in dirs if exclude_folder_pattern not in d]
+            relative_path = Path(root).relative_to(parent_path)
+            target_dir = str(relative_path).replace(os.sep, "_")
+            for name in fnmatch.filter(files, filename_pattern):
+                file = Path(root, name)
+                new_filename = f"{target_dir}_{file.name}" if target_dir else file
+                shutil.copy(file, images_dir / new_filename)
+                self.logger.info(f"Copying viz files: {new_filename} -> {images_dir}")
     
         self.logger.info("Matching visualization files have been copied to the images directory.")
 
 
 # Helpers
+def copy_file_rest(f, of) -> None:
+    """
+    Copy the rest of an open binary file, from its current position, to an open binary output file.
+    Copies in the kernel (copy_file_range/sendfile) where available, otherwise through a 1MB buffer.
+    :param f: Input file object.
+    :param of: Output file object.
+    """
+    offset = f.tell()
+    remaining = os.fstat(f.fileno()).st_size - offset
+    kernel_copy = getattr(os, 'copy_file_range', None) or getattr(os, 'sendfile', None)
+    if kernel_copy:
+        of.flush()
+        try:
+            while remaining > 0:
+                if kernel_copy is os.sendfile:
+                    n = os.sendfile(of.fileno(), f.fileno(), offset, remaining)
+                else:
+                    n = kernel_copy(f.fileno(), of.fileno(), remaining, offset_src=offset)
+                if n == 0:
+                    break
+                offset += n
+                remaining -= n
+            return
+        except OSError:
+            pass  # not supported for these files, fall back to buffered copy of what remains
+
+    f.seek(offset)
+    shutil.copyfileobj(f, of, length=1 << 20)
+
+
 def use_abs_path(root: Path, rel_path: Path) -> Path:
     """
     Return an absolute path if the input path is relative, otherwise return the input path
@@ -181,29 +217,41 @@ def use_abs_path(root: Path, rel_path: Path) -> Path:
     :param rel_path: Relative path
     :return: Absolute path
     """
-    if not rel_path.absolute():
+    if not rel_path.is_absolute():
         abs_dir = root / rel_path
         return abs_dir
     else:
         return rel_path
 
 
-def translate_html_template(translator: Translator, content: str):
+@lru_cache(maxsize=16)
+def parse_html_template(content: str) -> tuple[str, ...]:
+    """
+    Split template content at the template tags, once per distinct content.
+    :param content: HTML content
+    :return: Literal content parts alternating with the texts to translate
+    """
+    return tuple(template_tag_pattern.split(content))
+
+
+def translate_html_template(translator: Translator, content: str, translations: dict[str, str] = None):
     """
     Translate the text within the template tags.
     :param translator: Translator object
     :param content: HTML content
+    :param translations: Already translated texts, shared by templates translated in sequence, updated in place
     :return: Translated content
     """
-    pattern = r'\{\{\s*_\("([^"]+)"\)\s*\}\}'
-
-    def replace_word(match):
-        """Replace the matched word with the translated word."""
-        original_text = match.group(1)
-        translated_text = translator.translate(original_text) if translator else original_text
+    parts = list(parse_html_template(content))
+    
+    # translate each distinct text once, in a single batch
+    translations = {} if translations is None else translations
+    original_texts = list(set(parts[1::2]).difference(translations))
+    translated_texts = translator.translate_many(original_texts) if translator else original_texts
+    for original_text, translated_text in zip(original_texts, translated_texts):
         # replace single quotes with html encoding to avoid breaking javascript
-        translated_text = re.sub(r"'", "&apos;", translated_text)
-        return translated_text
+        translations[original_text] = translated_text.replace("'", "&apos;")
 
-    translated_content = re.sub(pattern, replace_word, content)
+    parts[1::2] = [translations[t] for t in parts[1::2]]
+    translated_content = "".join(parts)
     return translated_content
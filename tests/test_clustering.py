@@ -28,9 +28,9 @@ def xy_cols():
 
 
 def validate(df1, df2):
-    assert all(df1['cluster'] == pd.Series([0, 0, 1, 1, 1]))
-    assert all(df2['cluster_lon'] == pd.Series([1, 5]))
-    assert all(df2['cluster_lat'] == pd.Series([1, 5]))
+    np.testing.assert_array_equal(df1['cluster'].to_numpy(), [0, 0, 1, 1, 1])
+    np.testing.assert_array_equal(df2['cluster_lon'].to_numpy(), [1, 5])
+    np.testing.assert_array_equal(df2['cluster_lat'].to_numpy(), [1, 5])
 
 
 @pytest.mark.unit
@@ -1,5 +1,6 @@
 import pytest
 import math
+import os
 import pandas as pd
 import numpy as np
 
@@ -15,64 +16,92 @@ def mock_config():
 
 
 rel = 1e-9
-    
+
+# Cartesian coordinates of (0, 0) and (1, 1), used for expected distances
+xyz_0_0 = np.array(distance.convert_to_cartesian(0, 0))
+xyz_1_1 = np.array(distance.convert_to_cartesian(1, 1))
+
+
+def to_np(df: pd.DataFrame, cols: list[str]) -> np.ndarray:
+    """Get the columns values as a numpy array, without copying if possible."""
+    return df[cols].to_numpy(copy=False)
+
+
+@pytest.fixture(scope="module")
+def loc_fac_xyz():
+    """Locations and facilities with x, y, z columns, shared by the module tests, which must not modify them."""
+    df_loc = pd.DataFrame(
+        {'id': ['a', 'b', 'c'], 'f_id': ['q', 'q', 'q'], 'x': [0, 1, 2], 'y': [0, 1, 2], 'z': [0, 1, 2]})
+    df_facility = pd.DataFrame({'facility_id': ['q', 'r', 's'], 'x': [1, 2, 3], 'y': [1, 2, 3], 'z': [1, 2, 3]})
+    return df_loc, df_facility
+
+
+@pytest.fixture(scope="module")
+def loc_fac_lonlat():
+    """Locations and facilities with lon, lat columns, shared by the module tests, which must not modify them."""
+    df = pd.DataFrame({'id': ['a', 'b', 'c'], 'lon': [0, 1, 2], 'lat': [0, 1, 2]})
+    facilities = pd.DataFrame({'facility_id': ['q', 'r', 's'], 'lon': [1, 2, 3], 'lat': [1, 2, 3]})
+    return df, facilities
+
 
 @pytest.mark.unit
 def test_convert_to_cartesian():
+    # Convert all test cases in a single batched call
+    lon = np.array([0, 90, -1.5189055063720351])
+    lat = np.array([0, 0, 12.372283125598909])
+    elevation = np.array([0, 500, 297])
+    xs, ys, zs = distance.convert_to_cartesian(lon, lat, elevation)
+
     # Test case 1: lon = 0, lat = 0, elevation = 0
     # This is the prime meridian, equator, and sea level
-    x, y, z = distance.convert_to_cartesian(0, 0, 0)
-    
-    assert x == pytest.approx(6378137.0, rel=rel)
-    assert y + 1 == pytest.approx(1, rel=rel)
-    assert z + 1 == pytest.approx(1, rel=rel)
-    
-    # Note, when approx comparison with 0
-    # +1 is added to both sides to work around the
-    # pytest.approx limitation
+    # Note, the absolute tolerance applies to comparisons with 0
+    np.testing.assert_allclose([xs[0], ys[0], zs[0]], [6378137.0, 0, 0], rtol=rel, atol=1e-6)
     
     # Test case 2: lon = 90, lat = 0, elevation = 500
     # this is equator, 90 degree east of Greenwich with 500 elevation
-    x, y, z = distance.convert_to_cartesian(90, 0, 500)
-    
-    assert x + 1 == pytest.approx(1, rel=rel)
-    assert y == pytest.approx(6378637.0, rel=rel)
-    assert z + 1 == pytest.approx(1, rel=rel)
+    np.testing.assert_allclose([xs[1], ys[1], zs[1]], [0, 6378637.0, 0], rtol=rel, atol=1e-6)
        
     # Test case 3: Andre's example
-    f = (-1.5189055063720351, 12.372283125598909, 297)
-    x1, y1, z1 = distance.convert_to_cartesian(f[0], f[1], f[2])
-    
-    assert round(x1) == 6228112
-    assert round(y1) == -165145
-    assert round(z1) == 1366661
+    assert round(xs[2]) == 6228112
+    assert round(ys[2]) == -165145
+    assert round(zs[2]) == 1366661
     
 
+def minkowski_reference(xyz: np.ndarray, facility_xyz: np.ndarray, p: float) -> np.ndarray:
+    """Reference Minkowski distances of each location to a facility."""
+    return np.sum(np.abs(xyz - facility_xyz) ** p, axis=1) ** (1 / p)
+
+
+# x, y, z of the `loc_fac_xyz` locations and of their facility 'q'
+loc_xyz = np.array([[0, 0, 0], [1, 1, 1], [2, 2, 2]])
+fac_q_xyz = np.array([1, 1, 1])
+
+
 @pytest.mark.unit
-def test_calculate_minkowski_from_cartesian():
+@pytest.mark.parametrize("p, expected", [
+    # manually calculate distance.minkowski([0,0,0], [1,1,1], p=1.54) = 2.0408871750129656
+    (1.54, [2.040887175012965, 0, 2.0408871750129656]),
+    (2.0, minkowski_reference(loc_xyz, fac_q_xyz, 2.0)),
+    (1.0, minkowski_reference(loc_xyz, fac_q_xyz, 1.0)),
+])
+def test_calculate_minkowski_from_cartesian(loc_fac_xyz, p, expected):
     # Test with sample data
-    df_loc = pd.DataFrame(
-        {'id': ['a', 'b', 'c'], 'f_id': ['q', 'q', 'q'], 'x': [0, 1, 2], 'y': [0, 1, 2], 'z': [0, 1, 2]})
-    df_facility = pd.DataFrame({'facility_id': ['q', 'r', 's'], 'x': [1, 2, 3], 'y': [1, 2, 3], 'z': [1, 2, 3]})
+    df_loc, df_facility = loc_fac_xyz
     left_on = 'f_id'
     right_on = 'facility_id'
-    p = 1.54
-    # manually calculate distance.minkowski([0,0,0], [1,1,1], p=1.54) = 2.0408871750129656
     result = distance.calculate_minkowski_from_cartesian(df_loc, df_facility, left_on, right_on, p)
 
-    assert result['minkowski'][0] == pytest.approx(2.040887175012965, rel=rel)
-    assert result['minkowski'][1] == 0
-    assert result['minkowski'][2] == pytest.approx(2.0408871750129656, rel=rel)
+    np.testing.assert_allclose(result['minkowski'].to_numpy(), expected, rtol=rel, atol=0)
 
 
 @pytest.mark.unit
-def test_find_nearest_facility():
-    # generate two data frame with id and x, y columns
-    df_loc = pd.DataFrame({'id': ['a', 'b', 'c'], 'x': [0, 1, 2], 'y': [0, 1, 2]})
-    df_facility = pd.DataFrame({'facility_id': ['q', 'r', 's'], 'x': [1, 2, 3], 'y': [1, 2, 3]})
+def test_find_nearest_facility(loc_fac_xyz):
+    # two data frame with id and x, y columns (copy the locations, as columns are added below)
+    df_loc, df_facility = loc_fac_xyz
+    df_loc = df_loc[['id', 'x', 'y']].copy()
 
-    xy_ser = df_loc[['x', 'y']].values
-    xy_ser2 = df_facility[['x', 'y']].values
+    xy_ser = to_np(df_loc, ['x', 'y'])
+    xy_ser2 = to_np(df_facility, ['x', 'y'])
 
     nearest_facility_indices, shortest_distances = distance.find_nearest_facility(xy_ser, xy_ser2)
 
@@ -80,38 +109,46 @@ def test_find_nearest_facility():
     expected_distances = [math.sqrt(2), 0, 0]
 
     df_loc['distance'] = shortest_distances
-    df_loc['facility_id'] = df_facility['facility_id'][nearest_facility_indices].values
+    df_loc['facility_id'] = df_facility['facility_id'][nearest_facility_indices].to_numpy()
 
     assert df_loc['facility_id'].tolist() == expected_indices
-    assert df_loc['distance'].tolist() == pytest.approx(expected_distances, rel=4)
+    np.testing.assert_allclose(df_loc['distance'].to_numpy(), expected_distances, rtol=4, atol=1e-12)
 
 
 @pytest.mark.unit
-def test_calculate_distance_df():
-    # Create sample data
-    df = pd.DataFrame({'id': ['a', 'b', 'c'], 'lon': [0, 1, 2], 'lat': [0, 1, 2]})
-    facilities = pd.DataFrame({'facility_id': ['q', 'r', 's'], 'lon': [1, 2, 3], 'lat': [1, 2, 3]})
+def test_find_nearest_facility_with_norms():
+    df_loc = pd.DataFrame({'lon': [0.0, 1.0, 2.5], 'lat': [0.0, 1.0, 2.5]})
+    df_facility = pd.DataFrame({'lon': [1.0, 2.0, 3.0], 'lat': [1.0, 2.0, 3.0]})
+
+    xyz, norms = distance.cartesian_with_norms(df_loc, ['lon', 'lat'])
+    xyz2, norms2 = distance.cartesian_with_norms(df_facility, ['lon', 'lat'])
+
+    expected_indices, expected_distances = distance.find_nearest_facility(xyz, xyz2)
+    indices, distances = distance.find_nearest_facility(xyz, xyz2, norms, norms2)
+
+    assert indices.tolist() == expected_indices.tolist()
+    np.testing.assert_allclose(distances, expected_distances, rtol=rel, atol=1e-12)
+
+
+# Expected distances of the `loc_fac_lonlat` locations to their nearest facility, only the first location isn't at one
+expected_euclidean = np.array([*minkowski_reference(xyz_0_0[np.newaxis], xyz_1_1, 2), 0, 0])
+expected_minkowski = np.array([*minkowski_reference(xyz_0_0[np.newaxis], xyz_1_1, 1.54), 0, 0])
+
+
+@pytest.mark.unit
+def test_calculate_distance_df(loc_fac_lonlat):
+    # Sample data
+    df, facilities = loc_fac_lonlat
     df_xy = ['lon', 'lat']
     facilities_xy = ['lon', 'lat']
     column_prefix = 'distance'
 
-    # Define expected result
-    def cal_dist(a, b, p): return [np.power(np.sum(np.abs(a - b) ** p), 1 / p), 0, 0]
-
-    a = np.array(distance.convert_to_cartesian(0, 0))
-    b = np.array(distance.convert_to_cartesian(1, 1))
-    expected_distances_euclidean = cal_dist(a, b, 2)
-    expected_distances_minkowski = cal_dist(a, b, 1.54)
-
     # Call the function
     result = distance.calculate_distance_df(df, df_xy, facilities, facilities_xy, column_prefix)
 
     # Assert the output
-    msg = f"expected: {expected_distances_euclidean} actual {result['distance_euclidean'].values}"
-    assert all(abs(result['distance_euclidean'].values - expected_distances_euclidean) == 0), msg
-    
-    msg = f"expected: {expected_distances_minkowski} actual {result['distance_minkowski'].values}"
-    assert all(abs(result['distance_minkowski'].values - expected_distances_minkowski) == 0), msg
+    np.testing.assert_array_equal(result['distance_euclidean'].to_numpy(), expected_euclidean)
+    np.testing.assert_array_equal(result['distance_minkowski'].to_numpy(), expected_minkowski)
                     
 
 @pytest.mark.unit
@@ -131,3 +168,12 @@ def test_plot_ecdf_distance(mock_config):
     
     assert result is not None
 
+
+@pytest.mark.unit
+def test_prune_plot_cache_keeps_most_recent(tmp_path):
+    for i in range(5):
+        f = tmp_path / f"plot{i}.png"
+        f.write_bytes(b"png")
+        os.utime(f, (i, i))
+    distance.prune_plot_cache(tmp_path, max_files=3)
+    assert sorted(f.name for f in tmp_path.glob("*.png")) == ["plot2.png", "plot3.png", "plot4.png"]
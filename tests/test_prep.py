@@ -2,24 +2,33 @@ import pytest
 import geopandas as gpd
 import pandas as pd
 
+from functools import lru_cache
 from pathlib import Path
-from tempfile import mkdtemp
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 from deepfacility.data.inputs import DataInputs
-from deepfacility.config.config import Config, AdmPointsFile
+from deepfacility.config.config import AdmPointsFile
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_config():
-    return MagicMock(spec=Config)
+    # DataInputs only uses the inputs config section, a plain mock without the Config spec
+    return SimpleNamespace(inputs=MagicMock())
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_data_inputs(mock_config):
     return DataInputs(mock_config)
 
 
+@pytest.fixture(autouse=True)
+def reset_mock_config(mock_config):
+    """Replace the inputs config mock after each test, as tests assign values to it."""
+    yield
+    mock_config.inputs = MagicMock()
+
+
 # prepare_country_shapes tests
 
 @pytest.mark.unit
@@ -64,41 +73,51 @@ def test_households_preparation_when_file_exists(mock_data_inputs):
 
 
 @pytest.mark.unit
-def test_households_preparation_when_file_does_not_exist(mock_data_inputs):
-    mock_data_inputs.cfg.inputs.households.file = Path(mkdtemp()) / Path('nonexistent_file.csv')
-    with patch.object(Path, 'is_file', return_value=False), \
-         patch('geopandas.read_file', return_value=MagicMock()), \
-         patch('pandas.read_feather', return_value=MagicMock()), \
-         patch('deepfacility.data.inputs.DataInputs.process_buildings', return_value=MagicMock()), \
-         patch('pandas.DataFrame.to_csv'):
-        result = mock_data_inputs.prepare_households(Path('buildings_file.feather'), ['lon', 'lat'], Path('shapes_file.shp'), ['adm1', 'adm2'])
+def test_households_preparation_when_file_does_not_exist(mock_data_inputs, tmp_path, mocker):
+    mock_data_inputs.cfg.inputs.households.file = tmp_path / 'nonexistent_file.csv'
+    mocker.patch.object(Path, 'is_file', return_value=False)
+    mocker.patch('geopandas.read_file', return_value=MagicMock())
+    mocker.patch('pandas.read_feather', return_value=MagicMock())
+    mocker.patch('deepfacility.data.inputs.DataInputs.process_buildings', return_value=MagicMock())
+    mocker.patch('pandas.DataFrame.to_csv')
+    result = mock_data_inputs.prepare_households(Path('buildings_file.feather'), ['lon', 'lat'], Path('shapes_file.shp'), ['adm1', 'adm2'])
     assert result == mock_data_inputs.cfg.inputs.households.file
 
 
 # process_buildings tests
 
 
-@pytest.fixture
-def mock_gdf_shapes():
-    return gpd.GeoDataFrame({
+# Test frames are built once, fixtures return copies, as the code under test may modify them.
+
+
+@lru_cache
+def cached_df_xy() -> pd.DataFrame:
+    return pd.DataFrame({
         'x': [1, 2, 3, 4, 5],
         'y': [1, 2, 3, 4, 5]
     })
 
 
+@lru_cache
+def cached_gdf_shapes() -> gpd.GeoDataFrame:
+    return gpd.GeoDataFrame(cached_df_xy())
+
+
+@pytest.fixture
+def mock_gdf_shapes():
+    return cached_gdf_shapes().copy()
+
+
 @pytest.fixture
 def mock_df_xy():
-    return pd.DataFrame({
-        'x': [1, 2, 3, 4, 5],
-        'y': [1, 2, 3, 4, 5]
-    })
+    return cached_df_xy().copy()
 
 
 @pytest.mark.unit
 def test_buildings_processing_happy_path(mock_data_inputs, mock_gdf_shapes, mock_df_xy):
     with patch('deepfacility.data.inputs.process_google_buildings', return_value=mock_df_xy):
         result = mock_data_inputs.process_buildings(mock_gdf_shapes, ['x', 'y'], mock_df_xy, ['x', 'y'])
-    assert result.equals(mock_df_xy)
+    pd.testing.assert_frame_equal(result, mock_df_xy, check_dtype=False)
 
 
 @pytest.mark.unit
@@ -122,13 +141,13 @@ def mock_shape_files():
 
 
 @pytest.mark.unit
-def test_village_locality_preparation(mock_data_inputs, mock_village_locality, mock_shape_files):
-    mock_data_inputs.cfg.inputs.village_centers.file = Path(mkdtemp()) / Path('nonexistent_file.csv')
-    with patch('pandas.read_csv', return_value=MagicMock()), \
-         patch('geopandas.read_file', return_value=MagicMock()), \
-         patch('deepfacility.data.inputs.DataInputs.prepare_village_centers', return_value=MagicMock()), \
-         patch('pandas.DataFrame.to_csv'):
-        result = mock_data_inputs.prepare_village_locality(mock_village_locality, mock_shape_files)
+def test_village_locality_preparation(mock_data_inputs, mock_village_locality, mock_shape_files, tmp_path, mocker):
+    mock_data_inputs.cfg.inputs.village_centers.file = tmp_path / 'nonexistent_file.csv'
+    mocker.patch('pandas.read_csv', return_value=MagicMock())
+    mocker.patch('geopandas.read_file', return_value=MagicMock())
+    mocker.patch('deepfacility.data.inputs.DataInputs.prepare_village_centers', return_value=MagicMock())
+    mocker.patch('pandas.DataFrame.to_csv')
+    result = mock_data_inputs.prepare_village_locality(mock_village_locality, mock_shape_files)
     assert result == mock_data_inputs.cfg.inputs.village_centers.file
 
 
@@ -137,8 +156,8 @@ def mock_shape_file():
     return Path('shape.shp')
 
 
-@pytest.fixture
-def mock_df():
+@lru_cache
+def cached_df() -> pd.DataFrame:
     return pd.DataFrame({
         'x': [1.1, 2.1, 3.1, 4.1, 5.1],
         'y': [1.2, 2.2, 3.2, 4.2, 5.2],
@@ -148,15 +167,26 @@ def mock_df():
     })
 
 
-@pytest.fixture
-def mock_gdf(mock_df):
+@lru_cache
+def cached_gdf() -> gpd.GeoDataFrame:
+    df = cached_df()
     return gpd.GeoDataFrame({
         'NAME2': ['a2', 'b2', 'c2', 'd2', 'e2'],
         'NAME3': ['a3', 'b3', 'c3', 'd3', 'e3'],
-        'geometry': gpd.points_from_xy(mock_df.x, mock_df.y, crs="EPSG:4326"),
+        'geometry': gpd.points_from_xy(df.x, df.y, crs="EPSG:4326"),
     })
 
 
+@pytest.fixture
+def mock_df():
+    return cached_df().copy()
+
+
+@pytest.fixture
+def mock_gdf():
+    return cached_gdf().copy()
+
+
 @pytest.fixture
 def mock_baseline_file():
     return Path('baseline.csv')
@@ -195,7 +225,7 @@ def test_village_centers_preparation_happy_path(
         'lat': [1.2, 2.2, 3.2, 4.2, 5.2]
     })
 
-    assert df_res.equals(df_exp)
+    pd.testing.assert_frame_equal(df_res, df_exp, check_dtype=False)
     
     
 # prepare_baseline_facilities tests
@@ -207,26 +237,28 @@ def test_baseline_facilities_preparation(
         mock_baseline_file,
         mock_shape_file,
         mock_df,
-        mock_gdf):
-    import tempfile
+        mock_gdf,
+        tmp_path,
+        mocker):
     # Mock baseline facilities config
     bs = mock_data_inputs.cfg.inputs.baseline_facilities
-    bs.file = Path(tempfile.mkdtemp()) / 'baseline_facilities.csv'
+    bs.file = tmp_path / 'baseline_facilities.csv'
     bs.xy_cols = ['lon', 'lat']
     bs.adm_cols = ['adm2', 'adm3']
-    #          #patch('pandas.DataFrame.to_csv'), \
-    with patch.object(Path, 'is_file', return_value=True), \
-         patch('pandas.read_csv', return_value=mock_df), \
-         patch('geopandas.read_file', return_value=mock_gdf), \
-         patch('deepfacility.utils.spatial.get_plus_code', return_value='g'), \
-         patch('deepfacility.utils.spatial.create_geojson'):
-        bs_file = mock_data_inputs.prepare_baseline_facilities(
-            baseline_file=mock_baseline_file,
-            baseline_xy_cols=['x', 'y'],
-            shape_file=mock_shape_file,
-            shape_adm_cols=['NAME2', 'NAME3'],
-            info_cols=['info1', 'info2'],
-            id_col='id')
+    mocker.patch.object(Path, 'is_file', return_value=True)
+    mocker.patch('pandas.read_csv', return_value=mock_df)
+    mocker.patch('geopandas.read_file', return_value=mock_gdf)
+    mocker.patch('deepfacility.utils.spatial.get_plus_codes', side_effect=lambda lons, lats: ['g'] * len(lons))
+    mocker.patch('deepfacility.utils.spatial.create_geojson')
+    bs_file = mock_data_inputs.prepare_baseline_facilities(
+        baseline_file=mock_baseline_file,
+        baseline_xy_cols=['x', 'y'],
+        shape_file=mock_shape_file,
+        shape_adm_cols=['NAME2', 'NAME3'],
+        info_cols=['info1', 'info2'],
+        id_col='id')
+    # Undo the patches to read the saved file
+    mocker.stopall()
     
     df_exp = pd.DataFrame({
         'adm2': ['a2', 'b2', 'c2', 'd2', 'e2'],
@@ -244,4 +276,4 @@ def test_baseline_facilities_preparation(
     df_bs = pd.read_csv(bs_file)
     
     assert 'info_col' in df_bs.columns.values
-    assert df_exp.equals(df_bs[df_exp.columns.values])
+    pd.testing.assert_frame_equal(df_bs[df_exp.columns.values], df_exp, check_dtype=False)
@@ -23,3 +23,43 @@ def test_generate_new_session_id_when_no_source_provided():
     request: Request = MagicMock(query_params={}, cookies={})
     assert Session.get_session_id(request) is not None
     assert len(Session.get_session_id(request)) == 12
+
+
+@pytest.mark.unit
+def test_init_translator_uses_existing_session(monkeypatch):
+    from deepfacility.ux.session import app, templates
+    translator = MagicMock()
+    monkeypatch.setattr(app.state, "session", {'test123': Session(session_id='test123', translator=translator)}, raising=False)
+    request: Request = MagicMock(query_params={'sid': 'test123'}, cookies={})
+    with patch.object(Session, 'init') as mock_init:
+        Session.init_translator(request)
+    mock_init.assert_not_called()
+    assert templates.env.globals['_'] == translator.translate
+
+
+@pytest.mark.unit
+def test_session_store_evicts_least_recently_used_idle_sessions():
+    from deepfacility.ux.session import SessionStore
+    store = SessionStore(max_size=2)
+    store['busy'] = Session(session_id='busy', _operation=MagicMock())
+    store['a'] = Session(session_id='a')
+    store['b'] = Session(session_id='b')
+    assert list(store) == ['busy', 'b']
+    assert store.get('a') is None
+
+
+@pytest.mark.unit
+def test_start_task_does_not_wait_for_finished_stopped_task():
+    import time
+    s = Session(session_id='test123')
+    prev_op, op = MagicMock(), MagicMock()
+    prev_op.is_stopped.return_value = True
+    s._operation = prev_op
+    s._task_done.set()
+    background_tasks = MagicMock()
+    t0 = time.monotonic()
+    s.start_task(op, background_tasks, print)
+    assert time.monotonic() - t0 < 1
+    prev_op.clear.assert_called_once()
+    background_tasks.add_task.assert_called_once_with(print)
+    assert s.has_task and not s._task_done.is_set()
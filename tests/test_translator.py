@@ -3,20 +3,31 @@ import pytest
 
 from deepfacility.lang import translator_default as tr
 
+# language of the system locale, expected as the default translator language
+system_language = (locale.getlocale()[0] or 'en').split('_')[0].lower()
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def translator():
     return tr.DefaultTranslator()
 
 
+@pytest.fixture
+def restore_language(translator):
+    """Restore the shared translator language after a test changes it."""
+    language = translator.language
+    yield
+    translator.set_language(language)
+
+
 @pytest.mark.unit
 def test_translator_instantiate(translator):
     lang = translator.language
-    assert lang == locale.getlocale()[0].split('_')[0].lower()[:len(lang)]
+    assert lang == system_language[:len(lang)]
 
 
 @pytest.mark.unit
-def test_translator_set_language(translator):
+def test_translator_set_language(translator, restore_language):
     translator.set_language("en")
     assert translator.language == "en"
     assert translator.translate("hello") == "hello"
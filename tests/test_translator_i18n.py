@@ -1,18 +1,15 @@
-import importlib
 import pytest
 
-has_i18n = importlib.util.find_spec('torchvision')
-if has_i18n:
-    from deepfacility.lang import translator_i18n as tr
-
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def translator():
-    return tr.TranslatorI18N() if has_i18n else None
+    # Skip if the i18n dependencies are not installed, checked only when a test needs the translator
+    pytest.importorskip('torchvision', reason="TranslatorI18N is not available")
+    from deepfacility.lang import translator_i18n as tr
+    return tr.TranslatorI18N()
 
 
 @pytest.mark.unit
-@pytest.mark.skipif(not has_i18n, reason="TranslatorI18N is not available")
 def test_translate_supported_language(translator):
     msg = "Life"
     translator.set_language(language="fr")
@@ -22,7 +19,6 @@ def test_translate_supported_language(translator):
 
 
 @pytest.mark.unit
-@pytest.mark.skipif(not has_i18n, reason="TranslatorI18N is not available")
 def test_translate_unsupported_language(translator):
     msg = "Hola"
     translator.set_language(language="es")
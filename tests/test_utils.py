@@ -1,7 +1,7 @@
+import io
 import geopandas as gpd
 import requests
-import shutil
-import tempfile
+import zipfile
 
 import pandas as pd
 import pytest
@@ -43,16 +43,6 @@ def url_pattern():
     return "https://geodata.ucdavis.edu/gadm/gadm4.1/json/gadm41_BFA_{level}.json.zip"
 
 
-@pytest.fixture()
-def tmp_dir() -> Path:
-    tmp = tempfile.mkdtemp()
-    yield Path(tmp)
-    try:
-        shutil.rmtree(tmp)
-    except Exception as ex:
-        print('\n'.join(ex.args))
-    
-
 # download_url tests
 def has_internet():
     try:
@@ -63,8 +53,8 @@ def has_internet():
 
 
 @pytest.mark.skipif(not has_internet(), reason="No internet connection")
-def test_download_url_ok(tmp_dir, url_pattern):
-    expected, actual = download_url_test(tmp_dir, url_pattern, 0)
+def test_download_url_ok(tmp_path, url_pattern):
+    expected, actual = download_url_test(tmp_path, url_pattern, 0)
     assert expected == actual, "File name is not expected."
     try:
         gdf = gpd.read_file(actual)
@@ -74,8 +64,8 @@ def test_download_url_ok(tmp_dir, url_pattern):
 
 
 @pytest.mark.skipif(not has_internet(), reason="No internet connection")
-def test_download_url_404(tmp_dir, url_pattern):
-    expected, actual = download_url_test(tmp_dir, url_pattern, level=4)
+def test_download_url_404(tmp_path, url_pattern):
+    expected, actual = download_url_test(tmp_path, url_pattern, level=4)
     assert actual is None, "404 didn't return None."
     assert not expected.is_file(), "404 created a file."
 
@@ -91,23 +81,14 @@ def download_url_test(tmp_dir: Path, url_pattern: str, level: int):
 
 
 @pytest.mark.unit
-def test_strip_accents_removes_accented_characters():
-    assert util.strip_accents("Mëtàl") == "Metal"
-
-
-@pytest.mark.unit
-def test_strip_accents_removes_leading_and_trailing_spaces():
-    assert util.strip_accents(" Metal ") == "Metal"
-
-
-@pytest.mark.unit
-def test_strip_accents_removes_apostrophes():
-    assert util.strip_accents("Metal's") == "Metals"
-
-
-@pytest.mark.unit
-def test_strip_accents_handles_empty_string():
-    assert util.strip_accents("") == ""
+@pytest.mark.parametrize("text, expected", [
+    ("Mëtàl", "Metal"),      # removes accented characters
+    (" Metal ", "Metal"),    # removes leading and trailing spaces
+    ("Metal's", "Metals"),   # removes apostrophes
+    ("", ""),                # handles empty string
+])
+def test_strip_accents(text, expected):
+    assert util.strip_accents(text) == expected
 
 
 @pytest.mark.unit
@@ -120,110 +101,116 @@ def test_strip_accents_handles_non_string_input():
 
 
 @pytest.mark.unit
-def test_text_to_id_converts_text_with_spaces():
-    assert util.text_to_id("Hello World") == "Hello_World"
+@pytest.mark.parametrize("text, expected", [
+    ("Hello World", "Hello_World"),   # converts text with spaces
+    ("Hello@World!", "HelloWorld"),   # removes special characters
+    ("", ""),                         # handles empty string
+    (123, "123"),                     # handles non string input
+    ("Mëtàl", "Metal"),               # handles accented characters
+])
+def test_text_to_id(text, expected):
+    assert util.text_to_id(text) == expected
 
 
-@pytest.mark.unit
-def test_text_to_id_removes_special_characters():
-    assert util.text_to_id("Hello@World!") == "HelloWorld"
+# lists_to_dict tests
 
 
 @pytest.mark.unit
-def test_text_to_id_handles_empty_string():
-    assert util.text_to_id("") == ""
+@pytest.mark.parametrize("list1, list2, expected", [
+    (["a", "b", "c"], ["x", "y", "z"], {"a": "x", "b": "y", "c": "z"}),  # creates dictionary from two lists
+    ([], [], {}),                                                      # handles empty lists
+    (["a", "b", "c"], [1, 2], {"a": 1, "b": 2}),                       # handles lists of different lengths
+])
+def test_lists_to_dict(list1, list2, expected):
+    assert util.lists_to_dict(list1, list2) == expected
 
 
-@pytest.mark.unit
-def test_text_to_id_handles_non_string_input():
-    assert util.text_to_id(123) == "123"
+# letters tests
 
 
 @pytest.mark.unit
-def test_text_to_id_handles_accented_characters():
-    assert util.text_to_id("Mëtàl") == "Metal"
+def test_letters_many_matches_letters():
+    locs = ["Abcde:Fghij", "Kl:Mnopq:Rs", "Tuvwx"]
+    assert util.letters_many(locs, 3) == [util.letters(loc, 3) for loc in locs]
+    assert util.letters_many([], 3) == []
 
 
-# lists_to_dict tests
-
+# format_run_name tests
 
 @pytest.mark.unit
-def test_lists_to_dict_creates_dictionary_from_two_lists2():
-    list1 = ["a", "b", "c"]
-    list2 = ["x", "y", "z"]
-    assert util.lists_to_dict(list1, list2) == {"a": "x", "b": "y", "c": "z"}
+@pytest.mark.parametrize("locations, expected", [
+    (["Rw.*:[B|C]{2}.*"], "Rw-BC2_1_ba767f3"),  # creates run name from regex
+    (["location1"], "location1_1_ae11985"),     # creates run name from single location
+    (["location:1"], "location-1_1_f2ef959"),   # handles location with colon
+    (["Kaya:.*"], "Kaya-_1_b0a7746"),           # creates run name from regex matching all sub-locations
+    (["location1", "location2"], "location1_2_8b121c5"),  # creates run name from multiple locations
+])
+def test_format_run_name(locations, expected):
+    assert util.format_run_name(locations) == expected
 
 
 @pytest.mark.unit
-def test_lists_to_dict_handles_empty_lists():
-    assert util.lists_to_dict([], []) == {}
-
+def test_format_run_name_handles_empty_locations_list():
+    locations = []
+    with pytest.raises(AssertionError):
+        util.format_run_name(locations)
+        
 
 @pytest.mark.unit
-def test_lists_to_dict_handles_lists_of_different_lengths():
-    list1 = ["a", "b", "c"]
-    list2 = [1, 2]
-    assert util.lists_to_dict(list1, list2) == {"a": 1, "b": 2}
+def test_hash_strs_matches_hash_of_joined_strings():
+    parts = ["location1", "location2:a", "Mëtàl"]
+    assert util.hash_strs(parts) == util.hash_str("".join(parts))
+    assert util.hash_strs(parts, max_len=7) == util.hash_str("".join(parts), max_len=7)
 
 
-# format_run_name tests
-
-@pytest.mark.unit
-def test_format_run_name_creates_run_name_from_regex():
-    locations = ["Rw.*:[B|C]{2}.*"]
-    run_name = util.format_run_name(locations)
-    assert run_name == "Rw-BC2_1_ba767f3"
-    
-    
-@pytest.mark.unit
-def test_format_run_name_creates_run_name_from_single_location():
-    locations = ["location1"]
-    assert util.format_run_name(locations) == "location1_1_ae11985"
+# count_newlines tests
 
 
 @pytest.mark.unit
-def test_format_run_name_creates_run_name_from_multiple_locations():
-    locations = ["location1", "location2"]
-    assert util.format_run_name(locations).startswith("location1_2_")
+def test_count_newlines_matches_split(tmp_path):
+    file = tmp_path / "locations.csv"
+    text = "\n".join(f"loc{i}" for i in range(100)) + "\n"
+    file.write_text(text)
+    assert util.count_newlines(file, chunk_size=16) + 1 == len(text.split("\n"))
 
 
-@pytest.mark.unit
-def test_format_run_name_handles_location_with_colon():
-    locations = ["location:1"]
-    assert util.format_run_name(locations) == "location-1_1_f2ef959"
+# tail_lines tests
 
 
 @pytest.mark.unit
-def test_format_run_name_handles_empty_locations_list():
-    locations = []
-    with pytest.raises(AssertionError):
-        util.format_run_name(locations)
-        
+def test_tail_lines_returns_last_lines(tmp_path):
+    file = tmp_path / "test.log"
+    lines = [f"line {i}" for i in range(1000)]
+    file.write_text("\n".join(lines) + "\n")
+    assert util.tail_lines(file, n=30, block_size=64) == lines[-30:]
+    assert util.tail_lines(file, n=2000) == lines
+
 
 # create_zip tests
 
 
 @pytest.mark.unit
-def test_create_zip_creates_archive_from_files():
-    file_list = [Path(tempfile.mktemp(suffix=".txt")) for _ in range(3)]
+@pytest.mark.parametrize("n_files, missing_files", [
+    (3, []),                                # creates archive from files
+    (0, []),                                # handles empty file list
+    (0, [Path("/non/existent/path.txt")]),  # handles non existent files
+])
+def test_create_zip(n_files, missing_files, tmp_path):
+    file_list = [tmp_path / f"file{i}.txt" for i in range(n_files)]
     for file in file_list:
-        file.write_text("Test content")
-    zip_name = "test_archive.zip"
-    archive_path = util.create_zip(file_list, zip_name)
-    assert archive_path.is_file()
-
-
-@pytest.mark.unit
-def test_create_zip_handles_empty_file_list():
-    file_list = []
+        file.write_bytes(b"Test content")
     zip_name = "test_archive.zip"
-    archive_path = util.create_zip(file_list, zip_name)
+    archive_path = util.create_zip(file_list + missing_files, zip_name)
     assert archive_path.is_file()
 
 
 @pytest.mark.unit
-def test_create_zip_handles_non_existent_files():
-    file_list = [Path("/non/existent/path.txt")]
-    zip_name = "test_archive.zip"
-    archive_path = util.create_zip(file_list, zip_name)
-    assert archive_path.is_file()
+def test_stream_zip_matches_files(tmp_path):
+    file_list = [tmp_path / f"file{i}.txt" for i in range(3)]
+    for i, file in enumerate(file_list):
+        file.write_text(f"Test content {i}" * 1000)
+    data = b"".join(util.stream_zip(file_list + [Path("/non/existent/path.txt")], chunk_size=1000))
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.namelist() == [f.name for f in file_list]
+        for file in file_list:
+            assert zf.read(file.name).decode() == file.read_text()
@@ -12,45 +12,45 @@ from deepfacility.utils import util
 @pytest.mark.unit
 def test_clean_dataframe_removes_accents_and_spaces():
     df = pd.DataFrame({"name": ["Mëtàl ", " Rock "]})
-    assert all(util.clean_dataframe(df, ["name"])["name"] == pd.Series(["Metal", "Rock"]))
+    pd.testing.assert_series_equal(util.clean_dataframe(df, ["name"])["name"], pd.Series(["Metal", "Rock"], name="name"))
 
 
 @pytest.mark.unit
 def test_clean_dataframe_removes_apostrophes():
     df = pd.DataFrame({"name": ["Metal's", "Rock's"]})
-    assert all(util.clean_dataframe(df, ["name"])["name"] == pd.Series(["Metals", "Rocks"]))
+    pd.testing.assert_series_equal(util.clean_dataframe(df, ["name"])["name"], pd.Series(["Metals", "Rocks"], name="name"))
 
 
 @pytest.mark.unit
 def test_clean_dataframe_handles_empty_string():
     df = pd.DataFrame({"name": [""]})
-    assert all(util.clean_dataframe(df, ["name"])["name"] == pd.Series([""]))
+    pd.testing.assert_series_equal(util.clean_dataframe(df, ["name"])["name"], pd.Series([""], name="name"))
 
 
 @pytest.mark.unit
 def test_clean_dataframe_handles_non_string_input():
     df = pd.DataFrame({"name": [123, 456]})
-    assert all(util.clean_dataframe(df, ["name"])["name"] == pd.Series(["123", "456"]))
+    pd.testing.assert_series_equal(util.clean_dataframe(df, ["name"])["name"], pd.Series(["123", "456"], name="name"))
 
 
 @pytest.mark.unit
 def test_clean_dataframe_handles_mixed_input():
     df = pd.DataFrame({"name": ["Mëtàl's ", 123, " Rock's ", ""]})
-    assert all(util.clean_dataframe(df, ["name"])["name"] == pd.Series(["Metals", "123", "Rocks", ""]))
+    pd.testing.assert_series_equal(util.clean_dataframe(df, ["name"])["name"], pd.Series(["Metals", "123", "Rocks", ""], name="name"))
 
 
 @pytest.mark.unit
 def test_clean_dataframe_keeps_raw_columns():
     df = pd.DataFrame({"name": ["Mëtàl's ", 123, " Rock's ", ""]})
     cleaned_df = util.clean_dataframe(df, ["name"], keep=True)
-    assert all(cleaned_df["name_raw"] == pd.Series(["Mëtàl's ", 123, " Rock's ", ""]))
-    assert all(cleaned_df["name"] == pd.Series(["Metals", "123", "Rocks", ""]))
+    pd.testing.assert_series_equal(cleaned_df["name_raw"], pd.Series(["Mëtàl's ", 123, " Rock's ", ""], name="name_raw"))
+    pd.testing.assert_series_equal(cleaned_df["name"], pd.Series(["Metals", "123", "Rocks", ""], name="name"))
 
 
 @pytest.mark.unit
 def test_clean_dataframe_handles_no_columns():
     df = pd.DataFrame({"name": ["Mëtàl's ", 123, " Rock's ", ""]})
-    assert util.clean_dataframe(df, []).equals(df)
+    pd.testing.assert_frame_equal(util.clean_dataframe(df, []), df)
     
 
 # rename_df_cols tests
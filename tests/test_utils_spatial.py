@@ -2,14 +2,15 @@ import pandas as pd
 import geopandas as gpd
 import pytest
 
+from geopandas.testing import assert_geoseries_equal
 from pathlib import Path
-from shapely.geometry import Point
+from shapely.geometry import Point, Polygon
 from unittest.mock import patch
 
 from deepfacility.utils import spatial
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_df():
     data = {
         'lon': [12.4924, 12.4925, 12.4926],
@@ -22,7 +23,7 @@ def mock_df():
 # detect_country tests
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_gdf(mock_df):
     gdf = gpd.GeoDataFrame(
         mock_df, geometry=gpd.points_from_xy(mock_df.lon, mock_df.lat))
@@ -51,6 +52,7 @@ def test_detect_country_with_invalid_column_names(mock_gdf):
 
 @pytest.mark.unit
 def test_detect_country_with_nonexistent_country(mock_df):
+    mock_df = mock_df.copy()
     mock_df['lon'] = [180]*3
     mock_df['lat'] = [90]*3
     with pytest.raises(IndexError):
@@ -68,6 +70,15 @@ def test_plus_code():
     assert plus_code == "84VVQP4Q+QP"
 
 
+@pytest.mark.unit
+def test_plus_codes_match_plus_code():
+    longitudes = [-122.260630, 0.0, 179.99999, -180.0, 12.4924]
+    latitudes = [47.756917, 0.0, 90.0, -90.0, 41.8902]
+    plus_codes = spatial.get_plus_codes(longitudes, latitudes)
+    assert plus_codes[0] == "84VVQP4Q+QP"
+    assert list(plus_codes) == [spatial.get_plus_code(lon, lat) for lon, lat in zip(longitudes, latitudes)]
+
+
 # filter_locations tests
 
 
@@ -75,14 +86,21 @@ def test_plus_code():
 def test_filter_locations_filters_by_single_location():
     df = pd.DataFrame({"location": ["location1", "location2", "location3"]})
     filtered_df = spatial.filter_locations(df=df, locations=["location1"], columns=["location"])
-    assert all(filtered_df["location"] == pd.Series(["location1"]))
+    assert all(filtered_df.loc[:, "location"] == pd.Series(["location1"]))
 
 
 @pytest.mark.unit
 def test_filter_locations_filters_by_multiple_locations():
     df = pd.DataFrame({"location": ["location1", "location2", "location3"]})
     filtered_df = spatial.filter_locations(df, locations=["location1", "location3"], columns=["location"])
-    assert all(filtered_df["location"] == pd.Series(["location1", "location3"]))
+    assert all(filtered_df.loc[:, "location"] == pd.Series(["location1", "location3"]))
+
+
+@pytest.mark.unit
+def test_filter_locations_filters_categorical_column():
+    df = pd.DataFrame({"location": pd.Categorical(["location1", "location2", "location1", None])})
+    filtered_df = spatial.filter_locations(df, locations=["location1"], columns=["location"])
+    assert filtered_df.loc[:, "location"].tolist() == ["location1", "location1"]
 
 
 @pytest.mark.unit
@@ -106,6 +124,13 @@ def test_filter_locations_handles_empty_locations_list():
     assert filtered_df.empty
 
 
+@pytest.mark.unit
+def test_filter_locations_filters_by_multiple_columns():
+    df = pd.DataFrame({"adm2": ["a", "a", "b"], "adm3": ["x", "y", "x"]})
+    filtered_df = spatial.filter_locations(df, locations=["a:y", "b : x"], columns=["adm2", "adm3"])
+    assert filtered_df.to_dict(orient="list") == {"adm2": ["a", "b"], "adm3": ["y", "x"]}
+
+
 # location_path tests
 
 
@@ -150,7 +175,7 @@ def test_xy_to_gdf_creates_geodataframe_from_dataframe():
     df = pd.DataFrame({"lon": [1, 2, 3], "lat": [4, 5, 6]})
     gdf = spatial.xy_to_gdf(df, ["lon", "lat"])
     assert isinstance(gdf, gpd.GeoDataFrame)
-    assert all(gdf.geometry == gpd.GeoSeries([Point(1, 4), Point(2, 5), Point(3, 6)]))
+    assert_geoseries_equal(gdf.geometry, gpd.GeoSeries([Point(1, 4), Point(2, 5), Point(3, 6)], crs=spatial.default_crs))
     assert gdf.crs == spatial.default_crs
 
 
@@ -168,5 +193,93 @@ def test_xy_to_gdf_handles_dataframe_with_nan_values():
     df = pd.DataFrame({"lon": [1, 2, None], "lat": [4, None, 6]})
     gdf = spatial.xy_to_gdf(df, ["lon", "lat"])
     assert isinstance(gdf, gpd.GeoDataFrame)
-    assert all(gdf.geometry == gpd.GeoSeries([Point(1, 4)]))
+    assert_geoseries_equal(gdf.geometry, gpd.GeoSeries([Point(1, 4)], crs=spatial.default_crs))
+    assert gdf.crs == spatial.default_crs
+
+
+# xy_to_hulls tests
+
+
+@pytest.mark.unit
+def test_xy_to_hulls_creates_shape_per_group():
+    df = pd.DataFrame({"cluster": [0, 0, 0, 1], "lon": [0, 1, 0, 5], "lat": [0, 0, 1, 5]})
+    gdf = spatial.xy_to_hulls(df, ["lon", "lat"], ["cluster"])
+    assert list(gdf["cluster"]) == [0, 1]
+    assert all(gdf.geometry.geom_type == "Polygon")
+    assert gdf.geometry[0].equals(Polygon([(0, 0), (1, 0), (0, 1)]))
+    assert gdf.geometry[1].contains(Point(5, 5))
     assert gdf.crs == spatial.default_crs
+
+
+# clip_to_shape tests
+
+
+@pytest.mark.unit
+def test_clip_to_shape_clips_and_drops_outside_shapes():
+    gdf = gpd.GeoDataFrame({"id": [0, 1]},
+                           geometry=[Polygon([(0, 0), (2, 0), (2, 2), (0, 2)]), Polygon([(5, 5), (6, 5), (6, 6)])],
+                           crs=spatial.default_crs)
+    gdf_mask = gpd.GeoDataFrame(geometry=[Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])], crs=spatial.default_crs)
+    clipped = spatial.clip_to_shape(gdf, gdf_mask)
+    assert list(clipped["id"]) == [0]
+    assert clipped.geometry.iloc[0].area == pytest.approx(1.0)
+
+
+# locations_to_dataframe tests
+
+
+@pytest.mark.unit
+def test_locations_to_dataframe_splits_locations():
+    df = spatial.locations_to_dataframe(["a:b", " c:d "], columns=["adm2", "adm3"])
+    assert df.to_dict(orient="list") == {"adm2": ["a", "c"], "adm3": ["b", "d"]}
+
+
+@pytest.mark.unit
+def test_locations_to_dataframe_handles_empty_list():
+    df = spatial.locations_to_dataframe([], columns=["adm2", "adm3"])
+    assert df.empty
+    assert list(df.columns) == ["adm2", "adm3"]
+
+
+# frame_hash tests
+
+
+@pytest.mark.unit
+def test_frame_hash_depends_on_content(mock_gdf):
+    assert spatial.frame_hash(mock_gdf) == spatial.frame_hash(mock_gdf.copy())
+    changed = mock_gdf.copy()
+    changed.loc[0, 'lon'] = 0.0
+    assert spatial.frame_hash(mock_gdf) != spatial.frame_hash(changed)
+    changed = mock_gdf.set_geometry(gpd.points_from_xy(mock_gdf.lat, mock_gdf.lon))
+    assert spatial.frame_hash(mock_gdf) != spatial.frame_hash(changed)
+
+
+# CachedSjoin tests
+
+
+@pytest.mark.unit
+def test_cached_sjoin_matches_sjoin():
+    gdf = gpd.GeoDataFrame({"name": ["a", "b"]},
+                           geometry=[Polygon([(0, 0), (2, 0), (2, 2), (0, 2)]), Polygon([(1, 1), (3, 1), (3, 3), (1, 3)])],
+                           crs=spatial.default_crs)
+    df = pd.DataFrame({"lon": [0.5, 1.5, 2.5, 5.0], "lat": [0.5, 1.5, 2.5, 5.0]})
+    expected = gpd.sjoin(spatial.xy_to_gdf(df, ["lon", "lat"]), gdf, predicate="within")
+    joined = spatial.CachedSjoin(gdf).join_xy(df, ["lon", "lat"])
+    pd.testing.assert_frame_equal(pd.DataFrame(joined), pd.DataFrame(expected), check_like=True)
+
+
+# cache_join tests
+
+
+@pytest.mark.unit
+def test_cache_join_bounds_cached_bytes(monkeypatch):
+    frames = [spatial.xy_to_gdf(pd.DataFrame({"lon": [float(i)], "lat": [0.0]}), ["lon", "lat"]) for i in range(3)]
+    max_bytes = 2 * spatial.geodataframe_nbytes(frames[0])
+    monkeypatch.setattr(spatial, "join_cache", spatial.OrderedDict())
+    monkeypatch.setattr(spatial, "join_cache_nbytes", 0)
+    monkeypatch.setattr(spatial, "join_cache_max_bytes", max_bytes)
+    for i, frame in enumerate(frames):
+        joined = spatial.cache_join((i,), [frame], lambda f, key: f, None, frame)
+        pd.testing.assert_frame_equal(pd.DataFrame(joined), pd.DataFrame(frame))
+    assert list(spatial.join_cache) == [(1,), (2,)]
+    assert spatial.join_cache_nbytes <= max_bytes
@@ -1,7 +1,6 @@
 import pytest
 
 import os
-import tempfile
 import geopandas as gpd
 
 from pathlib import Path
@@ -14,35 +13,61 @@ from deepfacility.lang.translator import BaseTranslator
 result_dir = Path(os.path.dirname(__file__), "test_data", "results")
 
 
+@pytest.fixture(scope="module")
+def tmp_results(tmp_path_factory):
+    return tmp_path_factory.mktemp("viz")
+
+
+@pytest.mark.unit
+def test_create_from_shape(tmp_results):
+    spatial.create_geojson(Path(result_dir, 'village_shapes.shp'), "village_shapes", tmp_results, None, None)
+    expected_file_path = Path(tmp_results, "village_shapes.geojson")
+    assert os.path.exists(expected_file_path)
+    gdf = gpd.read_file(expected_file_path, engine="pyogrio")
+    assert len(gdf) == 3
+
+
 @pytest.mark.unit
-def test_create_from_shape():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        spatial.create_geojson(Path(result_dir, 'village_shapes.shp'), "village_shapes", Path(temp_dir), None, None)
-        expected_file_path = Path(temp_dir, "village_shapes.geojson")
-        assert os.path.exists(expected_file_path)
-        gdf = gpd.read_file(expected_file_path)
-        assert len(gdf) == 3
+def test_create_from_csv(tmp_results):
+    spatial.create_geojson(Path(result_dir, 'optimal_facilities.csv'), "optimal_facilities", tmp_results, 'lon', 'lat')
+    expected_file_path = Path(tmp_results, "optimal_facilities.geojson")
+    assert os.path.exists(expected_file_path)
+    gdf = gpd.read_file(expected_file_path, engine="pyogrio")
+    assert len(gdf) == 9
 
 
 @pytest.mark.unit
-def test_create_from_csv():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        spatial.create_geojson(Path(result_dir, 'optimal_facilities.csv'), "optimal_facilities", Path(temp_dir), 'lon', 'lat')
-        expected_file_path = Path(temp_dir, "optimal_facilities.geojson")
-        assert os.path.exists(expected_file_path)
-        gdf = gpd.read_file(expected_file_path)
-        assert len(gdf) == 9
+def test_create_geoparquet_from_csv(tmp_results):
+    file = spatial.create_geojson(Path(result_dir, 'optimal_facilities.csv'), "optimal_facilities", tmp_results,
+                                  'lon', 'lat', output_format='geoparquet')
+    assert file == Path(tmp_results, "optimal_facilities.parquet")
+    gdf = gpd.read_parquet(file)
+    assert len(gdf) == 9
 
 
 @pytest.mark.unit
-def test_translate_html_text(mocker):
+def test_translate_html_text():
     # Define the test input and expected output
     content = 'Hello, {{ _("world") }}!'
     expected_output = 'Hello, le monde!'
-    translator = BaseTranslator()
-    # Mock the replace_word function within translate_html_template
-    mocker.patch('deepfacility.lang.translator.BaseTranslator.translate', return_value="le monde")
+
+    # Stub translator with a fixed translation
+    class StubTranslator(BaseTranslator):
+        def translate(self, msg: str) -> str:
+            return "le monde"
+
+    translator = StubTranslator()
     # Call the function
     result = visualize.translate_html_template(translator, content)
     # Assert the expected result
-    assert result == expected_output
\ No newline at end of file
+    assert result == expected_output
+
+
+@pytest.mark.unit
+def test_copy_file_rest(tmp_path):
+    in_file, out_file = tmp_path / "in.geojson", tmp_path / "out.js"
+    in_file.write_bytes(b'{"type": "FeatureCollection",\n' + b'"features": []}' * 100_000)
+    with open(in_file, 'rb') as f, open(out_file, 'wb') as of:
+        of.write(b'var x= ' + f.readline())
+        visualize.copy_file_rest(f, of)
+    assert out_file.read_bytes() == b'var x= ' + in_file.read_bytes()